@@ -26,7 +26,7 @@ class UserAccountAdmin(admin.ModelAdmin):
     list_filter = ('deactivated', 'is_loggedin', 'is_blocked')
 
 class UserOtpAdmin(admin.ModelAdmin):
-    list_display = ('email', 'code', 'expire_at', 'created_at')
+    list_display = ('email', 'code', 'attempts', 'expire_at', 'created_at')
     search_fields = ('email', 'code')
     list_filter = ('expire_at', 'created_at')
 
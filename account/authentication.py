@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User, UserAccount, PrincipalUser
+
+
+USER_PRINCIPAL_KEY = 'auth_principal:{user_id}'
+
+# User fields cached with the principal: everything request handling reads
+# from request.user
+PRINCIPAL_FIELDS = ('id', 'is_active', 'email', 'verified')
+
+
+def get_user_principal(user_id):
+    """
+    The PRINCIPAL_FIELDS and blocked flag of a user (plus their password
+    fingerprint when CHECK_REVOKE_TOKEN is on), from the cache when possible.
+    The password hash and profile are never cached.
+
+    Entries are dropped whenever the user or their account changes and expire
+    after AUTH_USER_CACHE_TIMEOUT seconds otherwise. The drop only reaches other
+    worker processes through a shared cache (REDIS_URL or CACHE_BACKEND=file):
+    with the default process-local cache another worker may still accept a
+    blocked or deactivated user until its entry expires.
+    """
+    key = USER_PRINCIPAL_KEY.format(user_id=user_id)
+    principal = cache.get(key)
+    if principal is None:
+        user = User.objects.select_related('useraccount').get(pk=user_id)
+        try:
+            is_blocked = user.useraccount.is_blocked
+        except UserAccount.DoesNotExist:
+            is_blocked = False
+        principal = {field: getattr(user, field) for field in PRINCIPAL_FIELDS}
+        principal['is_blocked'] = is_blocked
+        if api_settings.CHECK_REVOKE_TOKEN:
+            principal['revoke_token'] = get_md5_hash_password(user.password)
+        cache.set(key, principal, settings.AUTH_USER_CACHE_TIMEOUT)
+    return principal
+
+
+def principal_user(principal):
+    """A PrincipalUser for a cached principal, raising on any field that isn't cached"""
+    return PrincipalUser.from_db(
+        User.objects.db, list(PRINCIPAL_FIELDS), [principal[field] for field in PRINCIPAL_FIELDS]
+    )
+
+
+def invalidate_user_principal(user_id):
+    """
+    Drop the cached principal now and again once the transaction commits, so a
+    request reading the old row in the meantime can't leave it cached.
+    """
+    key = USER_PRINCIPAL_KEY.format(user_id=user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the user id of the signed token and checks the
+    user against the principal cache, so authenticating costs no query while the
+    entry is fresh. Blocked accounts are rejected like they are at login.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        try:
+            principal = get_user_principal(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not principal['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != principal.get('revoke_token'):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        if principal['is_blocked']:
+            raise AuthenticationFailed(_('Your account has been blocked'), code='user_blocked')
+
+        return principal_user(principal)
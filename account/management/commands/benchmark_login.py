@@ -0,0 +1,88 @@
+from django.contrib.auth import authenticate
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+import time
+import uuid
+
+from account import services
+from account.models import User, UserAccount
+
+PASSWORD = 'Benchmark-Password-1'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure login throughput of the login service against the previous login flow '
+        '(test data is rolled back)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=50,
+            help='Number of users logging in, once each per flow'
+        )
+        parser.add_argument(
+            '--fast-hashing', action='store_true',
+            help='Use a cheap password hasher to measure the database side of a login alone'
+        )
+
+    def handle(self, *args, **options):
+        hashers = ['django.contrib.auth.hashers.MD5PasswordHasher'] if options['fast_hashing'] else None
+        self.stdout.write(f'⏱️  Benchmarking {options["users"]} logins on {connection.vendor}...')
+        with override_settings(**({'PASSWORD_HASHERS': hashers} if hashers else {})):
+            with transaction.atomic():
+                emails = self.create_users(options['users'])
+                self.report('previous flow', emails, self.previous_login)
+                self.report('login service', emails, self.service_login)
+                transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark complete (no data was kept)'))
+
+    def create_users(self, count):
+        emails = []
+        for _ in range(count):
+            user = User.objects.create_user(
+                email=f'benchmark-{uuid.uuid4().hex}@example.com', password=PASSWORD, verified=True
+            )
+            UserAccount.objects.create(user=user, firstname='Bench', lastname='Mark', email=user.email)
+            emails.append(user.email)
+        return emails
+
+    @staticmethod
+    def previous_login(email):
+        """/account/login/ before the login service: two account fetches and a full-row save"""
+        user = authenticate(email=email, password=PASSWORD)
+        user_account = UserAccount.objects.get(user=user)
+        if user_account.is_blocked:
+            return None
+        refresh = RefreshToken.for_user(user)
+        user_account = UserAccount.objects.get(user=user)
+        user_account.is_loggedin = True
+        user_account.save()
+        return str(refresh.access_token), str(refresh)
+
+    @staticmethod
+    def service_login(email):
+        user = services.authenticate_login(email, PASSWORD)
+        refresh = services.login(user)
+        return str(refresh.access_token), str(refresh), services.user_data(user)
+
+    def report(self, name, emails, login):
+        queries = []
+
+        def count_queries(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        # Start every flow from logged-out accounts
+        UserAccount.objects.filter(email__in=emails).update(is_loggedin=False)
+        with connection.execute_wrapper(count_queries):
+            started = time.perf_counter()
+            for email in emails:
+                login(email)
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'  {name:<15} {elapsed / len(emails) * 1000:8.2f} ms/login  '
+            f'{len(emails) / elapsed:8.1f} logins/s  {len(queries) / len(emails):.1f} queries/login'
+        )
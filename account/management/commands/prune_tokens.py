@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+import time
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding tokens and their blacklist entries, reporting the table sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Number of outstanding tokens deleted per DELETE statement'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Seconds to pause between chunks, to spread the load on a live database'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report what would be deleted'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        # Token lifetimes are fixed, so expired tokens are the oldest ones: walking
+        # the primary key finds them without an index on expires_at
+        expired = OutstandingToken.objects.filter(expires_at__lte=now).order_by('pk')
+
+        self.report_sizes('Before')
+        if options['dry_run']:
+            self.stdout.write(
+                f'🔍 {expired.count()} outstanding tokens '
+                f'({BlacklistedToken.objects.filter(token__expires_at__lte=now).count()} blacklisted) '
+                f'expired before {now:%Y-%m-%d %H:%M} UTC'
+            )
+            self.stdout.write(self.style.SUCCESS('✅ Dry run, nothing was deleted'))
+            return
+
+        self.stdout.write(f'🧹 Pruning tokens expired before {now:%Y-%m-%d %H:%M} UTC...')
+        started = time.monotonic()
+        total = blacklisted = 0
+        while True:
+            pks = list(expired.values_list('pk', flat=True)[:options['chunk_size']])
+            if not pks:
+                break
+            _, counts = OutstandingToken.objects.filter(pk__in=pks).delete()
+            total += counts.get(OutstandingToken._meta.label, 0)
+            blacklisted += counts.get(BlacklistedToken._meta.label, 0)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.report_sizes('After')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total} outstanding tokens ({blacklisted} blacklisted) deleted '
+            f'in {time.monotonic() - started:.2f}s'
+        ))
+
+    def report_sizes(self, label):
+        self.stdout.write(
+            f'📊 {label}: {OutstandingToken.objects.count()} outstanding tokens, '
+            f'{BlacklistedToken.objects.count()} blacklisted'
+        )
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+import time
+
+from account.models import UserOtp
+from account.otp import get_otp_store
+
+
+class Command(BaseCommand):
+    help = 'Delete expired one-time codes from the UserOtp table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Number of codes deleted per DELETE statement'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report what would be deleted'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            expired = UserOtp.objects.filter(expire_at__lte=timezone.now()).count()
+            self.stdout.write(f'🔍 {expired} expired codes of {UserOtp.objects.count()}')
+            self.stdout.write(self.style.SUCCESS('✅ Dry run, nothing was deleted'))
+            return
+
+        self.stdout.write(f'🧹 Purging expired one-time codes (OTP_STORE={settings.OTP_STORE})...')
+        started = time.monotonic()
+        total = get_otp_store().purge_expired(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total} expired codes deleted in {time.monotonic() - started:.2f}s'
+        ))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userotp',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='userotp',
+            index=models.Index(fields=['email', 'created_at'], name='account_otp_email_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userotp',
+            index=models.Index(fields=['expire_at'], name='account_otp_expire_idx'),
+        ),
+    ]
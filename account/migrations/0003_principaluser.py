@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:57
+
+import account.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0002_userotp_attempts_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrincipalUser',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('account.user',),
+            managers=[
+                ('objects', account.models.UserManager()),
+            ],
+        ),
+    ]
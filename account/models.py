@@ -64,6 +64,24 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
+class PrincipalUser(User):
+    """
+    The user of an API request, built from the cached auth principal (see
+    account.authentication). Only the cached fields are loaded, and reading any
+    other field raises instead of quietly querying the database: load the User
+    when the password or other fields are needed.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        if fields:
+            raise AttributeError(
+                f"{', '.join(fields)} not cached with the auth principal, load the User instead"
+            )
+        super().refresh_from_db(using, fields, from_queryset)
+
 class UserAccount(models.Model):
     user = models.OneToOneField(User, null=True, blank=True, on_delete=CASCADE)
     firstname = models.CharField(max_length=200, null=True, blank=True)
@@ -95,6 +113,13 @@ class UserOtp(models.Model) :
     email = models.CharField(max_length=250, null=True,blank = True)
     expire_at = models.DateTimeField(blank = True)
     created_at = models.DateTimeField(auto_now_add=True, blank = True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['email', 'created_at'], name='account_otp_email_created_idx'),
+            models.Index(fields=['expire_at'], name='account_otp_expire_idx'),
+        ]
 
     def __str__(self):
         return self.email
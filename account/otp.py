@@ -0,0 +1,137 @@
+"""
+One-time codes (email verification, password reset) behind a pluggable store.
+
+OTP_STORE picks the backend:
+- 'db' keeps one UserOtp row per email, found through the (email, created_at)
+  index; `purge_otps` deletes expired rows.
+- 'cache' keeps the code in the cache under the email and lets the cache
+  expire it. Use it with a shared cache (REDIS_URL): with a process-local cache
+  a code issued by one worker is unknown to the others.
+
+Both stores count attempts next to the code and drop a code after
+OTP_MAX_ATTEMPTS tries, and compare codes in constant time.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from datetime import timedelta
+import hashlib
+import hmac
+import secrets
+import string
+
+from .models import UserOtp
+
+
+OTP_LIFETIME = timedelta(minutes=10)
+OTP_KEY = 'otp:{email}'
+OTP_ATTEMPTS_KEY = 'otp_attempts:{email}'
+
+# Outcomes of verify()
+OTP_VALID = 'valid'
+OTP_INVALID = 'invalid'    # wrong, expired or out of attempts
+OTP_MISSING = 'missing'    # no code was issued (or it was used or purged)
+
+
+def generate_otp():
+    """Generate a 6-digit OTP"""
+    return ''.join(secrets.choice(string.digits) for _ in range(6))
+
+
+def codes_match(code, candidate):
+    return hmac.compare_digest(str(code).encode('utf-8'), str(candidate).encode('utf-8'))
+
+
+class DatabaseOtpStore:
+    """Codes in the UserOtp table"""
+
+    def issue(self, email):
+        """Replace the email's code with a new one and return it"""
+        code = generate_otp()
+        UserOtp.objects.filter(email=email).delete()
+        UserOtp.objects.create(email=email, code=code, expire_at=timezone.now() + OTP_LIFETIME)
+        return code
+
+    def verify(self, email, code):
+        """Check a code, consuming it when it matches"""
+        otp = UserOtp.objects.filter(email=email).order_by('-created_at').first()
+        if otp is None:
+            return OTP_MISSING
+        if otp.expire_at <= timezone.now():
+            return OTP_INVALID
+
+        # Count the attempt first, so concurrent guesses can't exceed the limit
+        counted = UserOtp.objects.filter(pk=otp.pk, attempts__lt=settings.OTP_MAX_ATTEMPTS).update(
+            attempts=F('attempts') + 1
+        )
+        if not counted:
+            otp.delete()
+            return OTP_INVALID
+        if not codes_match(otp.code, code):
+            return OTP_INVALID
+
+        otp.delete()
+        return OTP_VALID
+
+    def purge_expired(self, chunk_size=5000):
+        """Delete expired codes in chunks, returning how many were deleted"""
+        expired = UserOtp.objects.filter(expire_at__lte=timezone.now()).order_by('expire_at')
+        total = 0
+        while True:
+            pks = list(expired.values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                return total
+            deleted, _ = UserOtp.objects.filter(pk__in=pks).delete()
+            total += deleted
+
+
+class CacheOtpStore:
+    """Codes in the cache, expired by its TTL"""
+
+    @staticmethod
+    def keys(email):
+        # Hash the email so keys are valid on every cache backend
+        digest = hashlib.sha256(email.encode('utf-8')).hexdigest()
+        return OTP_KEY.format(email=digest), OTP_ATTEMPTS_KEY.format(email=digest)
+
+    def issue(self, email):
+        code = generate_otp()
+        code_key, attempts_key = self.keys(email)
+        timeout = int(OTP_LIFETIME.total_seconds())
+        cache.set_many({code_key: code, attempts_key: 0}, timeout)
+        return code
+
+    def verify(self, email, code):
+        code_key, attempts_key = self.keys(email)
+        stored = cache.get(code_key)
+        if stored is None:
+            return OTP_MISSING
+
+        try:
+            attempts = cache.incr(attempts_key)
+        except ValueError:
+            # The counter was evicted: treat the code as used up
+            attempts = settings.OTP_MAX_ATTEMPTS + 1
+        if attempts > settings.OTP_MAX_ATTEMPTS:
+            cache.delete_many([code_key, attempts_key])
+            return OTP_INVALID
+        if not codes_match(stored, code):
+            return OTP_INVALID
+
+        cache.delete_many([code_key, attempts_key])
+        return OTP_VALID
+
+    def purge_expired(self, chunk_size=5000):
+        # The cache expires codes itself
+        return 0
+
+
+OTP_STORES = {
+    'db': DatabaseOtpStore,
+    'cache': CacheOtpStore,
+}
+
+
+def get_otp_store():
+    return OTP_STORES[settings.OTP_STORE.lower()]()
@@ -1,7 +1,12 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth.password_validation import validate_password
 from .models import User, UserAccount, UserOtp
+from .authentication import get_user_principal, principal_user
+from .services import authenticate_login
+from .tokens import RefreshToken
 import secrets
 from datetime import datetime, timedelta
 
@@ -55,11 +60,9 @@ class UserLoginSerializer(serializers.Serializer):
         password = attrs.get('password')
         
         if email and password:
-            user = authenticate(email=email, password=password)
+            user = authenticate_login(email, password)
             if not user:
                 raise serializers.ValidationError('Invalid email or password')
-            if not user.is_active:
-                raise serializers.ValidationError('User account is disabled')
             attrs['user'] = user
             return attrs
         else:
@@ -138,3 +141,38 @@ class UserOtpSerializer(serializers.ModelSerializer):
         model = UserOtp
         fields = ('email', 'expire_at')
         read_only_fields = ('email', 'expire_at')
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer with the blacklist check and the user lookup served
+    from the cache (RefreshToken and the auth principal)
+    """
+    token_class = RefreshToken
+    
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        if user_id:
+            try:
+                user = principal_user(get_user_principal(user_id))
+            except User.DoesNotExist:
+                user = None
+            if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        
+        data = {'access': str(refresh.access_token)}
+        
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            
+            data['refresh'] = str(refresh)
+        
+        return data
@@ -0,0 +1,118 @@
+"""
+Login: checking credentials, recording the login and issuing JWTs. Shared by
+/account/login/ and /account/token/ so both apply the same rules.
+
+A login reads the user and their account in one query (select_related) and
+writes only the login columns that change, with one UPDATE per table.
+"""
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.settings import api_settings
+
+from main.cache import bump_data_version_on_commit
+
+from .models import User, UserAccount
+from .tokens import RefreshToken
+
+
+class LoginError(Exception):
+    """A login refused although the credentials are correct"""
+
+    def __init__(self, message, code, status_code):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.status_code = status_code
+
+
+def authenticate_login(email, password):
+    """
+    The active user with this email and password (their account loaded), or
+    None. Same checks as Django's ModelBackend.
+    """
+    try:
+        user = User.objects.select_related('useraccount').get(email=email)
+    except User.DoesNotExist:
+        # Hash anyway so unknown emails take as long as wrong passwords
+        User().set_password(password)
+        return None
+    if user.check_password(password) and user.is_active:
+        return user
+    return None
+
+
+def get_account(user):
+    try:
+        return user.useraccount
+    except UserAccount.DoesNotExist:
+        return None
+
+
+def check_login_allowed(user):
+    if not user.verified:
+        raise LoginError('Please verify your email before logging in', 'not_verified', status.HTTP_400_BAD_REQUEST)
+    account = get_account(user)
+    if account is not None and account.is_blocked:
+        raise LoginError('Your account has been blocked', 'user_blocked', status.HTTP_403_FORBIDDEN)
+
+
+def record_login(user, now=None):
+    """
+    Store last_login (when UPDATE_LAST_LOGIN is on) and the account's
+    is_loggedin flag with update()s, skipping save() and its signals.
+    last_login isn't in any cached response or the auth principal, but
+    is_loggedin is returned by /account/status/, so changing it bumps the
+    user's data version.
+    """
+    if api_settings.UPDATE_LAST_LOGIN:
+        user.last_login = now or timezone.now()
+        User.objects.filter(pk=user.pk).update(last_login=user.last_login)
+
+    account = get_account(user)
+    if account is not None and not account.is_loggedin:
+        account.is_loggedin = True
+        UserAccount.objects.filter(pk=account.pk).update(is_loggedin=True)
+        bump_data_version_on_commit(user.pk)
+
+
+def token_claims(user):
+    """Claims added to the user's tokens on top of the user id"""
+    account = get_account(user)
+    return {
+        'email': user.email,
+        'verified': user.verified,
+        'firstname': account.firstname if account else None,
+        'lastname': account.lastname if account else None,
+        'is_blocked': account.is_blocked if account else False,
+    }
+
+
+def get_token(user):
+    """A refresh token (carrying the custom claims) for the user"""
+    token = RefreshToken.for_user(user)
+    for claim, value in token_claims(user).items():
+        token[claim] = value
+    return token
+
+
+def user_data(user):
+    """The `user` object of login responses"""
+    claims = token_claims(user)
+    return {
+        'id': user.id,
+        'email': user.email,
+        'verified': user.verified,
+        'firstname': claims['firstname'],
+        'lastname': claims['lastname'],
+        'is_blocked': claims['is_blocked'],
+    }
+
+
+def login(user):
+    """
+    Log in an authenticated user: check they may log in, record the login and
+    return their refresh token. Raises LoginError.
+    """
+    check_login_allowed(user)
+    record_login(user)
+    return get_token(user)
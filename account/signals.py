@@ -0,0 +1,43 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from main.cache import bump_data_version_on_commit
+from .authentication import invalidate_user_principal
+from .models import User, UserAccount
+from .tokens import mark_revoked
+
+
+@receiver(post_save, sender=User)
+def bump_user_data_version(sender, instance, **kwargs):
+    """Invalidate cached responses that embed the user's details"""
+    bump_data_version_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    """Drop the cached auth principal (active flag) of a changed user"""
+    invalidate_user_principal(instance.pk)
+
+
+@receiver(post_save, sender=UserAccount)
+@receiver(post_delete, sender=UserAccount)
+def invalidate_account_user(sender, instance, **kwargs):
+    """The principal carries the account (blocked flag), drop it too"""
+    if instance.user_id:
+        invalidate_user_principal(instance.user_id)
+
+
+@receiver(post_save, sender=UserAccount)
+@receiver(post_delete, sender=UserAccount)
+def bump_account_data_version(sender, instance, **kwargs):
+    """Invalidate cached profile/status responses when the account changes"""
+    if instance.user_id:
+        bump_data_version_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def cache_revoked_token(sender, instance, created, **kwargs):
+    """Blacklisting (logout, admin) takes effect on the cached blacklist check at once"""
+    if created:
+        mark_revoked(instance.token.jti, instance.token.expires_at)
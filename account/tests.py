@@ -1,3 +1,48 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .authentication import get_user_principal, principal_user
+from .models import User
+from .tokens import RefreshToken
+
+
+class PrincipalUserTests(TestCase):
+    """request.user carries the cached principal fields and nothing else"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='principal@example.com', password='Old-password-1', verified=True)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_cached_fields_cost_no_query(self):
+        get_user_principal(self.user.pk)
+        with self.assertNumQueries(0):
+            user = principal_user(get_user_principal(self.user.pk))
+            self.assertEqual(
+                (user.pk, user.email, user.verified, user.is_active),
+                (self.user.pk, 'principal@example.com', True, True)
+            )
+
+    def test_uncached_fields_raise(self):
+        user = principal_user(get_user_principal(self.user.pk))
+        with self.assertNumQueries(0):
+            with self.assertRaises(AttributeError):
+                user.password
+            with self.assertRaises(AttributeError):
+                user.last_login
+
+    def test_status(self):
+        response = self.client.get('/account/status/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['email'], response.json()['verified']), ('principal@example.com', True))
+
+    def test_change_password(self):
+        response = self.client.post('/account/change-password/', {
+            'old_password': 'Old-password-1',
+            'new_password': 'New-password-2',
+            'new_password_confirm': 'New-password-2',
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password('New-password-2'))
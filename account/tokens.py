@@ -0,0 +1,59 @@
+"""
+Refresh tokens whose blacklist check is answered from the cache.
+
+simplejwt checks the blacklist with a BlacklistedToken/OutstandingToken join on
+every refresh. Revoked jtis are cached until the token expires and blacklisting
+a token caches it right away; "not revoked" answers are cached for
+REVOKED_TOKEN_CACHE_TIMEOUT seconds, which bounds how long a process-local
+cache (without REDIS_URL) of another worker may miss a revocation.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+REVOKED_TOKEN_KEY = 'revoked_token:{jti}'
+
+
+def revoked_cache_timeout(expires_at, revoked):
+    remaining = int((expires_at - timezone.now()).total_seconds())
+    if not revoked:
+        remaining = min(remaining, settings.REVOKED_TOKEN_CACHE_TIMEOUT)
+    return max(1, remaining)
+
+
+def is_revoked(jti, expires_at):
+    """Whether the token with this jti is blacklisted"""
+    key = REVOKED_TOKEN_KEY.format(jti=jti)
+    revoked = cache.get(key)
+    if revoked is None:
+        revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        # add(), not set(): a mark_revoked() racing with this read must win
+        cache.add(key, revoked, revoked_cache_timeout(expires_at, revoked))
+    return revoked
+
+
+def mark_revoked(jti, expires_at):
+    """
+    Record a blacklisted token in the cache, now and again once the transaction
+    commits (after which no reader can find the token missing from the table).
+    """
+    key = REVOKED_TOKEN_KEY.format(jti=jti)
+    cache.set(key, True, revoked_cache_timeout(expires_at, True))
+    transaction.on_commit(lambda: cache.set(key, True, revoked_cache_timeout(expires_at, True)))
+
+
+class RefreshToken(tokens.RefreshToken):
+    """RefreshToken checking the blacklist through the revoked-token cache"""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if is_revoked(jti, datetime_from_epoch(self.payload['exp'])):
+            raise TokenError(_('Token is blacklisted'))
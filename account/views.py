@@ -1,20 +1,22 @@
-from rest_framework import status, generics, permissions
+from rest_framework import status, generics, permissions, exceptions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth import login, logout
 from django.core.mail import send_mail
 from django.conf import settings
-from datetime import datetime, timedelta
-import random
-import string
+from django.utils.decorators import method_decorator
 
 # JWT imports
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
-from .models import User, UserAccount, UserOtp
+from main.cache import cache_user_response
+
+from . import services
+from .models import User, UserAccount
+from .otp import get_otp_store, OTP_VALID, OTP_MISSING
+from .tokens import RefreshToken
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer,
     UserProfileUpdateSerializer, PasswordChangeSerializer, PasswordResetRequestSerializer,
@@ -27,51 +29,25 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     
     @classmethod
     def get_token(cls, user):
-        token = super().get_token(user)
-        
-        # Add custom claims
-        token['email'] = user.email
-        token['verified'] = user.verified
-        
-        # Add user account information
-        try:
-            user_account = UserAccount.objects.get(user=user)
-            token['firstname'] = user_account.firstname
-            token['lastname'] = user_account.lastname
-            token['is_blocked'] = user_account.is_blocked
-        except UserAccount.DoesNotExist:
-            token['firstname'] = None
-            token['lastname'] = None
-            token['is_blocked'] = False
-        
-        return token
+        return services.get_token(user)
     
     def validate(self, attrs):
-        data = super().validate(attrs)
-        
-        # Add user information to response
-        data['user'] = {
-            'id': self.user.id,
-            'email': self.user.email,
-            'verified': self.user.verified,
-        }
+        self.user = services.authenticate_login(attrs[self.username_field], attrs['password'])
+        if self.user is None:
+            raise exceptions.AuthenticationFailed(
+                self.error_messages['no_active_account'], 'no_active_account'
+            )
         
-        # Add user account information
         try:
-            user_account = UserAccount.objects.get(user=self.user)
-            data['user'].update({
-                'firstname': user_account.firstname,
-                'lastname': user_account.lastname,
-                'is_blocked': user_account.is_blocked,
-            })
-        except UserAccount.DoesNotExist:
-            data['user'].update({
-                'firstname': None,
-                'lastname': None,
-                'is_blocked': False,
-            })
+            refresh = services.login(self.user)
+        except services.LoginError as e:
+            raise exceptions.AuthenticationFailed(e.message, e.code)
         
-        return data
+        return {
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+            'user': services.user_data(self.user),
+        }
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -79,11 +55,6 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 
-def generate_otp():
-    """Generate a 6-digit OTP"""
-    return ''.join(random.choices(string.digits, k=6))
-
-
 def send_otp_email(email, otp_code):
     """Send OTP via email"""
     subject = 'Joggle - Verification Code'
@@ -120,17 +91,8 @@ def signup(request):
         user.verified = True
         user.save()
         
-        # # Generate OTP (COMMENTED OUT)
-        # otp_code = generate_otp()
-        # expire_time = datetime.now() + timedelta(minutes=10)
-        # 
-        # # Save OTP (COMMENTED OUT)
-        # UserOtp.objects.filter(email=email).delete()  # Remove old OTPs
-        # UserOtp.objects.create(
-        #     email=email,
-        #     code=otp_code,
-        #     expire_at=expire_time
-        # )
+        # # Generate and save OTP, replacing old ones (COMMENTED OUT)
+        # otp_code = get_otp_store().issue(email)
         # 
         # # Send OTP email (COMMENTED OUT)
         # if send_otp_email(email, otp_code):
@@ -172,34 +134,30 @@ def verify_otp(request):
         otp_code = serializer.validated_data['otp_code']
         
         try:
-            # Get the latest OTP for this email
-            user_otp = UserOtp.objects.filter(email=email).latest('created_at')
+            # Check the OTP (consumed when it matches)
+            result = get_otp_store().verify(email, otp_code)
             
-            # Check if OTP is valid and not expired
-            if user_otp.code == otp_code and user_otp.expire_at > datetime.now():
+            if result == OTP_VALID:
                 # Activate user account
                 user = User.objects.get(email=email)
                 user.verified = True
                 user.save()
                 
-                # Delete used OTP
-                user_otp.delete()
-                
                 return Response(
                     {'message': 'Email verified successfully. You can now login.'},
                     status=status.HTTP_200_OK
                 )
+            elif result == OTP_MISSING:
+                return Response(
+                    {'error': 'No OTP found for this email'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             else:
                 return Response(
                     {'error': 'Invalid or expired OTP'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
                 
-        except UserOtp.DoesNotExist:
-            return Response(
-                {'error': 'No OTP found for this email'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
         except User.DoesNotExist:
             return Response(
                 {'error': 'User not found'}, 
@@ -221,17 +179,8 @@ def resend_otp(request):
         try:
             user = User.objects.get(email=email)
             
-            # Generate new OTP
-            otp_code = generate_otp()
-            expire_time = datetime.now() + timedelta(minutes=10)
-            
-            # Delete old OTPs and save new one
-            UserOtp.objects.filter(email=email).delete()
-            UserOtp.objects.create(
-                email=email,
-                code=otp_code,
-                expire_at=expire_time
-            )
+            # Replace any previous OTP with a new one
+            otp_code = get_otp_store().issue(email)
             
             # Send OTP email
             if send_otp_email(email, otp_code):
@@ -263,49 +212,17 @@ def user_login(request):
     if serializer.is_valid():
         user = serializer.validated_data['user']
         
-        # Check if user is verified
-        if not user.verified:
-            return Response(
-                {'error': 'Please verify your email before logging in'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Check if user account is blocked
-        try:
-            user_account = UserAccount.objects.get(user=user)
-            if user_account.is_blocked:
-                return Response(
-                    {'error': 'Your account has been blocked'}, 
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        except UserAccount.DoesNotExist:
-            pass
-        
-        # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
-        access_token = refresh.access_token
-        
-        # Update login status
         try:
-            user_account = UserAccount.objects.get(user=user)
-            user_account.is_loggedin = True
-            user_account.save()
-        except UserAccount.DoesNotExist:
-            pass
+            refresh = services.login(user)
+        except services.LoginError as e:
+            return Response({'error': e.message}, status=e.status_code)
         
         return Response(
             {
                 'message': 'Login successful',
-                'access': str(access_token),
+                'access': str(refresh.access_token),
                 'refresh': str(refresh),
-                'user': {
-                    'id': user.id,
-                    'email': user.email,
-                    'verified': user.verified,
-                    'firstname': user_account.firstname if 'user_account' in locals() else None,
-                    'lastname': user_account.lastname if 'user_account' in locals() else None,
-                    'is_blocked': user_account.is_blocked if 'user_account' in locals() else False,
-                }
+                'user': services.user_data(user),
             },
             status=status.HTTP_200_OK
         )
@@ -349,6 +266,10 @@ class UserProfileView(generics.RetrieveAPIView):
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
     
+    @method_decorator(cache_user_response)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_object(self):
         try:
             return UserAccount.objects.get(user=self.request.user)
@@ -375,7 +296,8 @@ def change_password(request):
     serializer = PasswordChangeSerializer(data=request.data)
     
     if serializer.is_valid():
-        user = request.user
+        # request.user only carries the cached principal, not the password
+        user = User.objects.get(pk=request.user.pk)
         old_password = serializer.validated_data['old_password']
         new_password = serializer.validated_data['new_password']
         
@@ -410,17 +332,8 @@ def request_password_reset(request):
         try:
             user = User.objects.get(email=email)
             
-            # Generate OTP for password reset
-            otp_code = generate_otp()
-            expire_time = datetime.now() + timedelta(minutes=10)
-            
-            # Delete old OTPs and save new one
-            UserOtp.objects.filter(email=email).delete()
-            UserOtp.objects.create(
-                email=email,
-                code=otp_code,
-                expire_at=expire_time
-            )
+            # Generate OTP for password reset, replacing any previous one
+            otp_code = get_otp_store().issue(email)
             
             # Send OTP email
             if send_otp_email(email, otp_code):
@@ -456,34 +369,30 @@ def confirm_password_reset(request):
         new_password = serializer.validated_data['new_password']
         
         try:
-            # Get the latest OTP for this email
-            user_otp = UserOtp.objects.filter(email=email).latest('created_at')
+            # Check the OTP (consumed when it matches)
+            result = get_otp_store().verify(email, otp_code)
             
-            # Check if OTP is valid and not expired
-            if user_otp.code == otp_code and user_otp.expire_at > datetime.now():
+            if result == OTP_VALID:
                 # Reset password
                 user = User.objects.get(email=email)
                 user.set_password(new_password)
                 user.save()
                 
-                # Delete used OTP
-                user_otp.delete()
-                
                 return Response(
                     {'message': 'Password reset successfully'},
                     status=status.HTTP_200_OK
                 )
+            elif result == OTP_MISSING:
+                return Response(
+                    {'error': 'No OTP found for this email'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             else:
                 return Response(
                     {'error': 'Invalid or expired OTP'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
                 
-        except UserOtp.DoesNotExist:
-            return Response(
-                {'error': 'No OTP found for this email'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
         except User.DoesNotExist:
             return Response(
                 {'error': 'User not found'}, 
@@ -495,6 +404,7 @@ def confirm_password_reset(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cache_user_response
 def user_status(request):
     """Get current user status"""
     try:
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from urllib.parse import urlparse
 import os
+import tempfile
 
 # Try to import decouple, fallback to os.environ if not available
 try:
@@ -124,6 +125,64 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Use Redis (e.g. Railway's REDIS_URL) when available, otherwise a local cache.
+# CACHE_BACKEND=file shares the cache between worker processes on one machine.
+REDIS_URL = config('REDIS_URL', default=None)
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+elif CACHE_BACKEND.lower() == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'joggle_cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'joggle',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Seconds a cached API response is kept (entries are also invalidated on writes)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Rows fetched per database round trip when a task list is streamed (?stream=true)
+STREAM_CHUNK_SIZE = config('STREAM_CHUNK_SIZE', default=2000, cast=int)
+
+# Delta sync: how long deletion tombstones are kept
+SYNC_TOMBSTONE_DAYS = config('SYNC_TOMBSTONE_DAYS', default=30, cast=int)
+
+# Seconds autocomplete results are cached per user and query (also invalidated on writes)
+AUTOCOMPLETE_CACHE_TIMEOUT = config('AUTOCOMPLETE_CACHE_TIMEOUT', default=30, cast=int)
+
+# Seconds the authenticated user is cached between requests (dropped on user/account changes).
+# Without a shared cache (REDIS_URL or CACHE_BACKEND=file) the drop only reaches the worker
+# that made the change: other workers see blocking/deactivation once their entry expires.
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+
+# Seconds a refresh token found not blacklisted is cached (blacklisting updates it at once)
+REVOKED_TOKEN_CACHE_TIMEOUT = config('REVOKED_TOKEN_CACHE_TIMEOUT', default=300, cast=int)
+
+# Where one-time codes live: "db" (UserOtp table) or "cache" (needs a shared cache, e.g. REDIS_URL)
+OTP_STORE = config('OTP_STORE', default='db')
+
+# Wrong tries allowed before a one-time code is dropped
+OTP_MAX_ATTEMPTS = config('OTP_MAX_ATTEMPTS', default=5, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -209,11 +268,15 @@ SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'account.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'main.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # JWT Configuration
@@ -243,6 +306,7 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
+    'TOKEN_REFRESH_SERIALIZER': 'account.serializers.CachedTokenRefreshSerializer',
     
     'JTI_CLAIM': 'jti',
     
@@ -34,6 +34,7 @@ def health_check(request):
 def debug_info(request):
     """Debug endpoint to help troubleshoot deployment issues"""
     from django.conf import settings
+    from main.cache import response_cache_stats
     import os
     return JsonResponse({
         'status': 'debug',
@@ -41,6 +42,8 @@ def debug_info(request):
         'database_engine': settings.DATABASES['default']['ENGINE'],
         'allowed_hosts': settings.ALLOWED_HOSTS,
         'installed_apps_count': len(settings.INSTALLED_APPS),
+        'cache_backend': settings.CACHES['default']['BACKEND'],
+        'response_cache': response_cache_stats(),
         'environment_vars': {
             'SECRET_KEY_set': bool(os.environ.get('SECRET_KEY')),
             'DEBUG': os.environ.get('DEBUG'),
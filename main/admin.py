@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Project, Task, TaskOrder
+from .models import Project, Task, TaskOrder, DeletionLog
 
 
 @admin.register(Project)
@@ -25,3 +25,11 @@ class TaskOrderAdmin(admin.ModelAdmin):
     search_fields = ['user__email', 'task__title', 'reference']
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['user', 'context', 'reference', 'position']
+
+
+@admin.register(DeletionLog)
+class DeletionLogAdmin(admin.ModelAdmin):
+    list_display = ['user', 'model', 'object_id', 'deleted_at']
+    list_filter = ['model', 'deleted_at']
+    search_fields = ['user__email', 'object_id']
+    readonly_fields = ['user', 'model', 'object_id', 'deleted_at']
@@ -0,0 +1,215 @@
+"""
+Typo-tolerant autocomplete of task titles and project names.
+
+Matches are scored like pg_trgm's word_similarity(): the share of the query's
+trigrams found in the text, so a partly typed or misspelt word still matches.
+PostgreSQL evaluates it with the `<%` operator on trigram GIN indexes
+(migration 0007). Other databases use an in-process trigram index of the
+user's rows, brought up to date when their data version changes. Results are
+cached per user for AUTOCOMPLETE_CACHE_TIMEOUT seconds.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from collections import Counter, OrderedDict
+from functools import lru_cache
+import hashlib
+import heapq
+import math
+import re
+import threading
+
+from .cache import get_data_version
+from .models import Project, Task, DeletionLog, ChangeSequence
+
+
+AUTOCOMPLETE_KINDS = ('task', 'project')
+AUTOCOMPLETE_CACHE_KEY = 'autocomplete:{user_id}:{version}:{kind}:{limit}:{query}'
+
+# Minimum share of the query's trigrams a match must contain
+SIMILARITY_THRESHOLD = 0.5
+
+# (model, text field, extra fields returned with each match)
+SOURCES = {
+    'task': (Task, 'title', ('project_id', 'is_done')),
+    'project': (Project, 'name', ('color_code',)),
+}
+
+
+def trigrams(text, prefix=False):
+    """
+    Trigrams of the lower-cased words of `text`, padded like pg_trgm (two spaces
+    before a word, one after). With `prefix` the last word is taken as still
+    being typed and gets no trailing pad.
+    """
+    words = re.findall(r'\w+', text.lower())
+    grams = set()
+    for index, word in enumerate(words):
+        grams.update(word_trigrams(word, prefix and index == len(words) - 1))
+    return grams
+
+
+@lru_cache(maxsize=100000)
+def word_trigrams(word, prefix=False):
+    # Titles reuse a small vocabulary, so most words come from the cache
+    padded = f'  {word}' if prefix else f'  {word} '
+    return tuple(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """
+    Trigram postings of one user's rows of one kind. Rows are appended oldest
+    first, so a larger position means a more recent row; a changed row is
+    appended again and its previous position marked dead.
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.rows = []
+        self.postings = {}
+        self.positions = {}
+        self.dead = set()
+
+    def add(self, row):
+        self.remove(str(row['id']))
+        position = len(self.rows)
+        self.rows.append(row)
+        self.positions[str(row['id'])] = position
+        for gram in trigrams(row[self.field]):
+            self.postings.setdefault(gram, []).append(position)
+
+    def remove(self, row_id):
+        position = self.positions.pop(row_id, None)
+        if position is not None:
+            self.dead.add(position)
+
+    def is_fragmented(self):
+        return len(self.dead) > max(1000, len(self.positions))
+
+    def search(self, query, limit):
+        """Top `limit` rows by similarity, then most recently updated"""
+        grams = trigrams(query, prefix=True)
+        if not grams:
+            return []
+        hits = Counter()
+        for gram in grams:
+            hits.update(self.postings.get(gram, ()))
+
+        needed = math.ceil(SIMILARITY_THRESHOLD * len(grams))
+        by_count = {}
+        for position, count in hits.items():
+            if count >= needed and position not in self.dead:
+                by_count.setdefault(count, []).append(position)
+
+        results = []
+        for count in sorted(by_count, reverse=True):
+            for position in heapq.nlargest(limit - len(results), by_count[count]):
+                results.append({**self.rows[position], 'score': round(count / len(grams), 4)})
+            if len(results) >= limit:
+                break
+        return results
+
+
+class IndexRegistry:
+    """
+    In-process TrigramIndex per (user, kind), least recently used ones dropped
+    first. When the user's data version has moved on, an index catches up with
+    the rows and tombstones stamped after the change sequence value it was last
+    synced to, like delta sync does, instead of being rebuilt.
+    """
+
+    def __init__(self, size=128):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id, kind, version):
+        key = (user_id, kind)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = {'lock': threading.Lock(), 'version': None, 'index': None, 'synced_seq': None}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+        with entry['lock']:
+            if entry['version'] != version:
+                self.refresh(entry, user_id, kind)
+                entry['version'] = version
+            return entry['index']
+
+    @staticmethod
+    def refresh(entry, user_id, kind):
+        model, field, extra = SOURCES[kind]
+        # Read before the rows: every change stamped up to this value has committed
+        current = ChangeSequence.objects.filter(user_id=user_id).values_list('value', flat=True).first() or 0
+        rows = model.objects.filter(user_id=user_id).order_by('change_seq', 'id')
+        index = entry['index']
+        if index is None or index.is_fragmented():
+            index = TrigramIndex(field)
+        else:
+            changed = Q(change_seq__gt=entry['synced_seq'], change_seq__lte=current)
+            rows = rows.filter(changed)
+            deleted = DeletionLog.objects.filter(changed, user_id=user_id, model=kind)
+            for object_id in deleted.values_list('object_id', flat=True):
+                index.remove(object_id)
+        for row in rows.values('id', field, 'updated_at', *extra):
+            index.add(row)
+        entry['index'] = index
+        entry['synced_seq'] = current
+
+
+registry = IndexRegistry()
+
+
+def postgres_matches(user_id, kind, query, limit):
+    """Top matches computed by PostgreSQL with the pg_trgm operators"""
+    model, field, extra = SOURCES[kind]
+    column = f'"{model._meta.db_table}"."{field}"'
+    rows = model.objects.filter(user_id=user_id).filter(
+        # `<%` is what the trigram GIN index can answer
+        RawSQL(f'%s <%% {column}', (query,), output_field=BooleanField())
+    ).annotate(
+        score=RawSQL(f'word_similarity(%s, {column})', (query,), output_field=FloatField())
+    ).order_by('-score', '-updated_at').values('id', field, 'updated_at', *extra, 'score')[:limit]
+
+    connection = connections[rows.db]
+    with transaction.atomic(using=rows.db):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL pg_trgm.word_similarity_threshold = %s', [SIMILARITY_THRESHOLD])
+        return [{**row, 'score': round(row['score'], 4)} for row in rows]
+
+
+def find_matches(user_id, kind, query, limit, version):
+    """Top `limit` matches of `query` among the user's rows of `kind`"""
+    if connections[Task.objects.db].vendor == 'postgresql':
+        return postgres_matches(user_id, kind, query, limit)
+    return registry.get(user_id, kind, version).search(query, limit)
+
+
+def autocomplete(user_id, kind, query, limit):
+    """
+    Cached top matches as response data. The key includes the user's data
+    version, so any write makes earlier results unreachable.
+    """
+    version = get_data_version(user_id)
+    digest = hashlib.sha1(query.strip().lower().encode('utf-8')).hexdigest()
+    key = AUTOCOMPLETE_CACHE_KEY.format(user_id=user_id, version=version, kind=kind, limit=limit, query=digest)
+    results = cache.get(key)
+    if results is None:
+        _, field, extra = SOURCES[kind]
+        results = [
+            {
+                'id': str(row['id']),
+                'kind': kind,
+                field: row[field],
+                **{name.removesuffix('_id'): str(row[name]) if name.endswith('_id') else row[name] for name in extra},
+                'score': row['score'],
+            }
+            for row in find_matches(user_id, kind, query, limit, version)
+        ]
+        cache.set(key, results, settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+    return results
@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.response import Response
+from functools import wraps
+import hashlib
+import time
+
+
+DATA_VERSION_KEY = 'data_version:{user_id}'
+RESPONSE_CACHE_KEY = 'response:{user_id}:{fingerprint}'
+RESPONSE_CACHE_STATS_KEY = 'response_cache_stats:{outcome}'
+
+
+def get_data_version(user_id):
+    """
+    Return the user's data version, a number that increases whenever one of the
+    user's tasks, projects or task orders is written.
+    """
+    key = DATA_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a version lost to eviction is never handed out again
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_data_version(user_id):
+    """Increase the user's data version, invalidating every ETag issued so far"""
+    key = DATA_VERSION_KEY.format(user_id=user_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def bump_data_version_on_commit(user_id):
+    """
+    Bump the version once the current transaction commits, so a concurrent
+    reader can't pair the new version with data it read before the commit.
+    """
+    transaction.on_commit(lambda: bump_data_version(user_id))
+
+
+def request_fingerprint(request):
+    """
+    Hash of the user's data version, the current date (suggested dates roll over
+    at midnight) and the request path including its query parameters
+    """
+    version = get_data_version(request.user.pk)
+    fingerprint = f'{version}:{timezone.now().date()}:{request.get_full_path()}'
+    return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+
+
+def collection_etag(request, *args, **kwargs):
+    """Weak ETag for a user's collection endpoint"""
+    return 'W/"%s"' % request_fingerprint(request)
+
+
+def cache_user_response(view_func):
+    """
+    Cache the data of successful GET responses per user.
+
+    Entries are keyed on the user's data version, so any write to the user's
+    tasks, projects, task orders or account makes them unreachable; they then
+    expire after RESPONSE_CACHE_TIMEOUT seconds.
+    Use method_decorator() for view methods.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return view_func(request, *args, **kwargs)
+
+        key = RESPONSE_CACHE_KEY.format(user_id=request.user.pk, fingerprint=request_fingerprint(request))
+        data = cache.get(key)
+        if data is not None:
+            record_response_cache('hits')
+            return Response(data)
+
+        record_response_cache('misses')
+        response = view_func(request, *args, **kwargs)
+        if isinstance(response, Response) and response.status_code == 200 and response.data is not None:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
+
+
+def record_response_cache(outcome):
+    key = RESPONSE_CACHE_STATS_KEY.format(outcome=outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing counter (or a backend that doesn't store anything): start at 1
+        if not cache.add(key, 1, timeout=None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass
+
+
+def response_cache_stats():
+    """Hit/miss counters of the response cache, for monitoring"""
+    hits = cache.get(RESPONSE_CACHE_STATS_KEY.format(outcome='hits'), 0)
+    misses = cache.get(RESPONSE_CACHE_STATS_KEY.format(outcome='misses'), 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,88 @@
+"""
+Streaming export of all of a user's data (projects, tasks and task orders).
+
+Rows are read with QuerySet.iterator() (server-side cursors on PostgreSQL) and
+encoded one at a time, so memory use stays flat whatever the account size.
+"""
+from django.conf import settings
+import csv
+import io
+import zlib
+
+from .models import Project, Task, TaskOrder
+from .renderers import FastJSONRenderer, buffer_chunks
+from .serializers import TaskSerializer, TaskReadSerializer, TaskOrderReadSerializer, get_datetime_formatter
+
+
+PROJECT_FIELDS = ('id', 'name', 'description', 'color_code', 'is_default', 'created_at', 'updated_at')
+TASK_FIELDS = tuple(TaskSerializer.Meta.fields)
+TASK_ORDER_FIELDS = ('id', 'context', 'reference', 'task', 'position', 'created_at', 'updated_at')  # TaskOrderReadSerializer output
+
+# A single CSV header for all record types; columns a type doesn't have stay empty
+CSV_COLUMNS = ['type']
+for fields in (PROJECT_FIELDS, TASK_FIELDS, TASK_ORDER_FIELDS):
+    CSV_COLUMNS += [field for field in fields if field not in CSV_COLUMNS]
+
+
+def export_records(user):
+    """Yield (type, data) for each of the user's projects, tasks and task orders"""
+    chunk_size = settings.STREAM_CHUNK_SIZE
+    format_datetime = get_datetime_formatter()
+
+    projects = Project.objects.filter(user=user).order_by('created_at', 'id').values(*PROJECT_FIELDS)
+    for row in projects.iterator(chunk_size=chunk_size):
+        yield 'project', {
+            **row,
+            'id': str(row['id']),
+            'created_at': format_datetime(row['created_at']),
+            'updated_at': format_datetime(row['updated_at']),
+        }
+
+    serializer = TaskReadSerializer()
+    tasks = TaskReadSerializer.rows(Task.objects.filter(user=user).order_by('created_at', 'id'))
+    for row in tasks.iterator(chunk_size=chunk_size):
+        yield 'task', serializer.to_representation(row)
+
+    serializer = TaskOrderReadSerializer()
+    orders = TaskOrderReadSerializer.rows(
+        TaskOrder.objects.filter(user=user).order_by('context', 'reference', 'position', 'id')
+    )
+    for row in orders.iterator(chunk_size=chunk_size):
+        yield 'task_order', serializer.to_representation(row)
+
+
+def ndjson_lines(records):
+    """One JSON object per line: {"type": ..., "data": {...}}"""
+    renderer = FastJSONRenderer()
+    for record_type, data in records:
+        yield renderer.render({'type': record_type, 'data': data}) + b'\n'
+
+
+def csv_lines(records):
+    """CSV rows with a `type` column and the union of all record fields"""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS, restval='')
+    writer.writeheader()
+    yield output.getvalue().encode('utf-8')
+    for record_type, data in records:
+        output.seek(0)
+        output.truncate()
+        writer.writerow({'type': record_type, **data})
+        yield output.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte strings into a gzip stream"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(user, export_format, compress=False):
+    """Byte chunks of the user's export in `export_format` ('ndjson' or 'csv')"""
+    encode = csv_lines if export_format == 'csv' else ndjson_lines
+    chunks = buffer_chunks(encode(export_records(user)))
+    return gzip_chunks(chunks) if compress else chunks
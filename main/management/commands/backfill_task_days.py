@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+import time
+
+from main.models import Task, TaskDay
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TaskDay agenda rows of all tasks (run after deploying TaskDay or changing TIME_ZONE)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Number of tasks rebuilt per transaction'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Seconds to pause between chunks to reduce load on a live database'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+
+        self.stdout.write('📅 Rebuilding task agenda days...')
+        started = time.monotonic()
+        total = 0
+        last_pk = None
+
+        while True:
+            tasks = Task.objects.order_by('pk').only(*TaskDay.TASK_FIELDS)
+            if last_pk:
+                tasks = tasks.filter(pk__gt=last_pk)
+            chunk = list(tasks[:chunk_size])
+            if not chunk:
+                break
+
+            TaskDay.sync_tasks(chunk)
+            total += len(chunk)
+            last_pk = chunk[-1].pk
+
+            if len(chunk) < chunk_size:
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Agenda days rebuilt for {total} tasks in {elapsed:.2f}s'))
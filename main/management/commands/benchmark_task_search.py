@@ -0,0 +1,111 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from datetime import timedelta
+from django.utils import timezone
+import random
+import time
+import uuid
+
+from main.models import Project, Task
+from main.renderers import FastJSONRenderer
+from main.search import search_tasks
+from main.serializers import TaskReadSerializer
+
+User = get_user_model()
+
+WORDS = [
+    'invoice', 'report', 'meeting', 'garden', 'kitchen', 'dentist', 'budget', 'review', 'deploy', 'groceries',
+    'birthday', 'flight', 'insurance', 'laptop', 'painting', 'taxes', 'workout', 'library', 'plumber', 'recipe',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare server-side task search with downloading the full task list and filtering it '
+        'on the client (test data is rolled back)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10000, 100000],
+            help='Numbers of tasks to benchmark with'
+        )
+        parser.add_argument(
+            '--query', default='plumber invoice',
+            help='Search terms'
+        )
+        parser.add_argument(
+            '--page-size', type=int, default=50,
+            help='Results returned by the search endpoint per page'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Runs per measurement, the fastest one is reported'
+        )
+
+    def handle(self, *args, **options):
+        query = options['query']
+        self.stdout.write(f'⏱️  Benchmarking task search for "{query}" on {connection.vendor}...')
+        for size in options['sizes']:
+            with transaction.atomic():
+                user, tasks = self.create_tasks(size)
+                self.report(size, 'client-side filter', options['repeat'],
+                            lambda: self.client_side(tasks, query))
+                self.report(size, 'search endpoint', options['repeat'],
+                            lambda: self.server_side(tasks, user, query, options['page_size']))
+                transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark complete (no data was kept)'))
+
+    def create_tasks(self, size):
+        user = User.objects.create_user(email=f'benchmark-{uuid.uuid4().hex}@example.com')
+        project = Project.objects.create(name='Benchmark', user=user)
+        rnd = random.Random(size)
+        now = timezone.now()
+        batch = []
+        for i in range(size):
+            batch.append(Task(
+                title=' '.join(rnd.choices(WORDS, k=3)) + f' {i}',
+                description=' '.join(rnd.choices(WORDS, k=8)) if i % 2 else None,
+                deadline=now + timedelta(days=i % 30) if i % 3 else None,
+                project=project,
+                user=user,
+            ))
+            if len(batch) == 5000:
+                Task.objects.bulk_create(batch)
+                batch = []
+        Task.objects.bulk_create(batch)
+        return user, Task.objects.filter(user=user).with_effective_suggested_todo_datetime()
+
+    @staticmethod
+    def client_side(tasks, query):
+        """What clients do today: GET /tasks/ and keep the tasks containing every term"""
+        rows = TaskReadSerializer.rows(tasks.order_by('-created_at', 'id'))
+        data = TaskReadSerializer(rows, many=True).data
+        body = FastJSONRenderer().render(data)
+        words = query.lower().split()
+        return body, [
+            task for task in data
+            if all(word in f"{task['title']} {task['description'] or ''}".lower() for word in words)
+        ]
+
+    @staticmethod
+    def server_side(tasks, user, query, page_size):
+        """GET /tasks/search/?q=...&page_size=N: first page of ranked matches"""
+        rows = TaskReadSerializer.rows(
+            search_tasks(tasks, user, query).order_by('-search_rank', '-created_at', 'id')[:page_size]
+        )
+        data = TaskReadSerializer(rows, many=True).data
+        return FastJSONRenderer().render(data), data
+
+    def report(self, size, name, repeat, run):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body, matches = run()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        self.stdout.write(
+            f'  {size:>7} tasks  {name:<20} {best * 1000:9.1f} ms  '
+            f'{len(body) / 1024:9.1f} KiB transferred  ({len(matches)} matches)'
+        )
@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from datetime import timedelta
+import time
+import uuid
+
+from main.models import Project, Task, PRIORITY_CHOICES
+from main.serializers import TaskSerializer, TaskReadSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compare per-task serialization cost of TaskSerializer and TaskReadSerializer (test data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000],
+            help='Task list sizes to benchmark'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Runs per measurement, the fastest one is reported'
+        )
+        parser.add_argument(
+            '--projects', type=int, default=10,
+            help='Number of projects the tasks are spread over'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('⏱️  Benchmarking task serializers...')
+        for size in options['sizes']:
+            with transaction.atomic():
+                tasks = self.create_tasks(size, options['projects'])
+                self.report(size, 'TaskSerializer', options['repeat'],
+                            lambda: TaskSerializer(tasks.all(), many=True).data)
+                self.report(size, 'TaskReadSerializer', options['repeat'],
+                            lambda: TaskReadSerializer(TaskReadSerializer.rows(tasks.all()), many=True).data)
+                transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark complete (no data was kept)'))
+
+    def create_tasks(self, size, project_count):
+        user = User.objects.create_user(email=f'benchmark-{uuid.uuid4().hex}@example.com')
+        projects = Project.objects.bulk_create([
+            Project(name=f'Benchmark {i}', user=user) for i in range(project_count)
+        ])
+        now = timezone.now()
+        priorities = [value for value, _ in PRIORITY_CHOICES]
+        Task.objects.bulk_create([
+            Task(
+                title=f'Task {i}',
+                description='Benchmark task' if i % 2 else None,
+                priority=priorities[i % len(priorities)],
+                deadline=now + timedelta(days=i % 30) if i % 3 else None,
+                suggested_todo_datetime=now - timedelta(days=i % 5),
+                is_done=i % 4 == 0,
+                project=projects[i % project_count],
+                user=user,
+            )
+            for i in range(size)
+        ], batch_size=1000)
+        return Task.objects.filter(user=user).with_effective_suggested_todo_datetime().order_by('-created_at', 'id')
+
+    def report(self, size, name, repeat, serialize):
+        best = None
+        queries = []
+
+        def count_queries(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        for _ in range(repeat):
+            queries.clear()
+            with connection.execute_wrapper(count_queries):
+                started = time.perf_counter()
+                data = serialize()
+                elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        self.stdout.write(
+            f'  {size:>6} tasks  {name:<20} {best * 1000:9.1f} ms  '
+            f'{best / size * 1e6:7.1f} µs/task  {len(queries)} queries  ({len(data)} rows)'
+        )
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+import time
+
+from main.models import Task, TaskDay
+
+
+class Command(BaseCommand):
+    help = 'Compare the TaskDay agenda rows with the task dates and repair tasks whose rows drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Number of tasks checked per query'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report tasks with drifted rows without writing'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+
+        self.stdout.write(f'🔎 Checking task agenda days{" (dry run)" if dry_run else ""}...')
+        started = time.monotonic()
+        checked = 0
+        drifted = []
+        last_pk = None
+
+        while True:
+            tasks = Task.objects.order_by('pk').only(*TaskDay.TASK_FIELDS)
+            if last_pk:
+                tasks = tasks.filter(pk__gt=last_pk)
+            chunk = list(tasks[:chunk_size])
+            if not chunk:
+                break
+
+            stored = {task.pk: set() for task in chunk}
+            rows = TaskDay.objects.filter(task__in=stored).values_list(
+                'task_id', 'user_id', 'day', 'via_suggested', 'via_deadline', 'via_created'
+            )
+            for task_id, *row in rows:
+                stored[task_id].add(tuple(row))
+
+            stale = [task for task in chunk if stored[task.pk] != self.expected_rows(task)]
+            for task in stale:
+                self.stdout.write(f'  ⚠️  Task {task.pk}: agenda rows out of date')
+            if stale and not dry_run:
+                TaskDay.sync_tasks(stale)
+            drifted += stale
+            checked += len(chunk)
+            last_pk = chunk[-1].pk
+
+            if len(chunk) < chunk_size:
+                break
+
+        elapsed = time.monotonic() - started
+        verb = 'drifted' if dry_run else 'repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {checked} tasks checked, {len(drifted)} {verb} in {elapsed:.2f}s'
+        ))
+
+    @staticmethod
+    def expected_rows(task):
+        return {
+            (row.user_id, row.day, row.via_suggested, row.via_deadline, row.via_created)
+            for row in TaskDay.rows_for(task)
+        }
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Max
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from datetime import timedelta
+import time
+
+from main.models import DeletionLog, ChangeSequence
+
+
+class Command(BaseCommand):
+    help = 'Delete sync tombstones older than the retention period (clients with older tokens resync from scratch)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.SYNC_TOMBSTONE_DAYS,
+            help='Keep tombstones this many days (defaults to SYNC_TOMBSTONE_DAYS)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Number of tombstones deleted per DELETE statement'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        expired = DeletionLog.objects.filter(deleted_at__lt=cutoff).order_by('pk')
+
+        self.stdout.write(f'🧹 Pruning tombstones older than {cutoff:%Y-%m-%d %H:%M} UTC...')
+        started = time.monotonic()
+        total = 0
+        while True:
+            pks = list(expired.values_list('pk', flat=True)[:options['chunk_size']])
+            if not pks:
+                break
+            pruned = DeletionLog.objects.filter(pk__in=pks)
+            with transaction.atomic():
+                # Sync tokens below the pruned tombstones must reset instead of missing them
+                ChangeSequence.objects.filter(user__in=pruned.values('user_id')).update(pruned_value=Greatest(
+                    F('pruned_value'),
+                    Subquery(
+                        pruned.filter(user_id=OuterRef('user_id')).order_by().values('user_id')
+                        .annotate(highest=Max('change_seq')).values('highest')
+                    ),
+                ))
+                deleted, _ = pruned.delete()
+            total += deleted
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total} tombstones deleted in {time.monotonic() - started:.2f}s'
+        ))
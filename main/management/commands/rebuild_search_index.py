@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+import time
+
+from main.search import create_search_index, drop_search_index
+
+
+class Command(BaseCommand):
+    help = 'Recreate the SQLite full-text search table and triggers of tasks (PostgreSQL maintains its index itself)'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Nothing to rebuild: the search index is maintained by {connection.vendor}'
+            ))
+            return
+
+        self.stdout.write('🔍 Rebuilding the task search index...')
+        started = time.monotonic()
+        with transaction.atomic():
+            drop_search_index(connection)
+            create_search_index(connection)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Search index rebuilt in {elapsed:.2f}s'))
@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+import time
+
+from main.cache import bump_data_version_on_commit
+from main.models import Project, ChangeSequence, project_count_annotations
+
+
+class Command(BaseCommand):
+    help = 'Recompute the task counters stored on projects and repair any drift (also refreshes overdue counts)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of projects recounted per query'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report projects with drifted counters without writing'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+        fields = Project.COUNTER_FIELDS
+
+        now = timezone.now()
+        annotations = {f'actual_{field}': expression for field, expression in project_count_annotations(now).items()}
+
+        self.stdout.write(f'🔢 Reconciling project task counters{" (dry run)" if dry_run else ""}...')
+        started = time.monotonic()
+        checked = 0
+        repaired = 0
+        last_pk = None
+
+        while True:
+            projects = Project.objects.order_by('pk')
+            if last_pk:
+                projects = projects.filter(pk__gt=last_pk)
+            chunk = list(projects.annotate(**annotations).only('pk', *fields)[:chunk_size])
+            if not chunk:
+                break
+
+            for project in chunk:
+                actual = {field: getattr(project, f'actual_{field}') for field in fields}
+                drifted = {field: value for field, value in actual.items() if getattr(project, field) != value}
+                if drifted:
+                    repaired += 1
+                    if not dry_run:
+                        self.repair(project.pk, annotations)
+            checked += len(chunk)
+            last_pk = chunk[-1].pk
+
+            if len(chunk) < chunk_size:
+                break
+
+        elapsed = time.monotonic() - started
+        verb = 'drifted' if dry_run else 'repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {checked} projects checked, {repaired} {verb} in {elapsed:.2f}s'
+        ))
+
+    @staticmethod
+    def repair(project_pk, annotations):
+        """
+        Recount one project while holding its row lock: task writes update the
+        counters through the same row, so none of their deltas can be lost.
+        The project is stamped with a new change sequence value and the user's
+        data version moves so delta sync and cached responses pick up the
+        repaired counters.
+        """
+        user_id = Project.objects.values_list('user_id', flat=True).get(pk=project_pk)
+        with transaction.atomic():
+            # The sequence is locked before the project, in the order every write takes them
+            change_seq = ChangeSequence.next_value(user_id)
+            Project.objects.select_for_update().values_list('pk', flat=True).get(pk=project_pk)
+            counts = Project.objects.filter(pk=project_pk).aggregate(**{
+                field: expression for field, expression in annotations.items()
+            })
+            Project.objects.filter(pk=project_pk).update(updated_at=timezone.now(), change_seq=change_seq, **{
+                field[len('actual_'):]: value for field, value in counts.items()
+            })
+            bump_data_version_on_commit(user_id)
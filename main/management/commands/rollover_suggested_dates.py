@@ -0,0 +1,115 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef
+from pathlib import Path
+import json
+import time
+
+from main.models import Task, TaskDay, ChangeSequence, start_of_today, rolled_over_suggested_todo_datetime
+
+
+class Command(BaseCommand):
+    help = 'Roll overdue suggested_todo_datetime values of pending tasks onto today (keeps the time of day)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Number of tasks updated per UPDATE statement'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report how many tasks would be rolled over without writing'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='File storing the last processed primary key so an interrupted run can resume'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Seconds to pause between chunks to reduce load on a live database'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+        checkpoint = Path(options['checkpoint']) if options['checkpoint'] else None
+
+        today_start = start_of_today()
+        # Conditions are re-checked by every UPDATE, so tasks completed or
+        # rescheduled while the job runs are left alone.
+        stale = Task.objects.filter(is_done=False, suggested_todo_datetime__lt=today_start).order_by('pk')
+
+        last_pk = self.read_checkpoint(checkpoint, today_start)
+        if last_pk:
+            self.stdout.write(f'⏩ Resuming after task {last_pk}')
+
+        self.stdout.write(f'🔄 Rolling suggested dates over to {today_start.date()}{" (dry run)" if dry_run else ""}...')
+        started = time.monotonic()
+        total = 0
+        chunks = 0
+
+        while True:
+            chunk_started = time.monotonic()
+            pending = stale.filter(pk__gt=last_pk) if last_pk else stale
+            pks = list(pending.values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                break
+
+            if dry_run:
+                rows = len(pks)
+            else:
+                with transaction.atomic():
+                    chunk = stale.filter(pk__gte=pks[0], pk__lte=pks[-1])
+                    # Stamp the rolled over tasks with a new value of their owner's sequence
+                    ChangeSequence.advance(chunk.order_by().values_list('user_id', flat=True).distinct())
+                    rows = chunk.update(
+                        suggested_todo_datetime=rolled_over_suggested_todo_datetime(today_start),
+                        change_seq=ChangeSequence.current_value(OuterRef('user_id')),
+                    )
+                    # UPDATE bypasses Task.save, move the agenda rows along
+                    TaskDay.sync_tasks(Task.objects.filter(pk__in=pks).only(*TaskDay.TASK_FIELDS))
+            elapsed = time.monotonic() - chunk_started
+
+            total += rows
+            chunks += 1
+            last_pk = pks[-1]
+            if not dry_run:
+                self.write_checkpoint(checkpoint, today_start, last_pk)
+
+            self.stdout.write(f'  Chunk {chunks}: {rows} tasks ({self.rate(rows, elapsed)} rows/s)')
+
+            if len(pks) < chunk_size:
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        if checkpoint and not dry_run and checkpoint.exists():
+            checkpoint.unlink()
+
+        elapsed = time.monotonic() - started
+        verb = 'would be rolled over' if dry_run else 'rolled over'
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total} tasks {verb} in {chunks} chunks, {elapsed:.2f}s ({self.rate(total, elapsed)} rows/s)'
+        ))
+
+    @staticmethod
+    def rate(rows, elapsed):
+        return f'{rows / elapsed:.0f}' if elapsed > 0 else 'n/a'
+
+    @staticmethod
+    def read_checkpoint(checkpoint, today_start):
+        """Return the last processed pk from a checkpoint written for the same day"""
+        if not checkpoint or not checkpoint.exists():
+            return None
+        state = json.loads(checkpoint.read_text())
+        if state.get('day') != today_start.date().isoformat():
+            return None
+        return state.get('last_pk')
+
+    @staticmethod
+    def write_checkpoint(checkpoint, today_start, last_pk):
+        if checkpoint:
+            checkpoint.write_text(json.dumps({
+                'day': today_start.date().isoformat(),
+                'last_pk': str(last_pk),
+            }))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:20
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def backfill_task_counters(apps, schema_editor):
+    Project = apps.get_model('main', 'Project')
+    now = timezone.now()
+    projects = Project.objects.annotate(
+        actual_task_count=Count('tasks'),
+        actual_pending_count=Count('tasks', filter=Q(tasks__is_done=False)),
+        actual_completed_count=Count('tasks', filter=Q(tasks__is_done=True)),
+        actual_overdue_count=Count('tasks', filter=Q(tasks__is_done=False, tasks__deadline__lt=now)),
+    )
+    for project in projects.iterator(chunk_size=1000):
+        Project.objects.filter(pk=project.pk).update(
+            task_count=project.actual_task_count,
+            pending_count=project.actual_pending_count,
+            completed_count=project.actual_completed_count,
+            overdue_count=project.actual_overdue_count,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='completed_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='overdue_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='pending_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_task_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:35
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """CREATE INDEX CONCURRENTLY on PostgreSQL, a plain AddIndex on other databases"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    # Concurrent index builds can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('main', '0003_sync_deletion_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='task',
+            index=models.Index(fields=['user', 'is_done', 'created_at'], name='main_task_user_id_f82fea_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='task',
+            index=models.Index(fields=['user', 'deadline'], name='main_task_user_id_b08ff7_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='task',
+            index=models.Index(fields=['user', 'suggested_todo_datetime'], name='main_task_user_id_24405e_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_done', False)), fields=['user', 'deadline'], name='main_task_pending_deadline_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_done', False)), fields=['user', 'suggested_todo_datetime'], name='main_task_pending_suggest_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_task_days(apps, schema_editor):
+    Task = apps.get_model('main', 'Task')
+    TaskDay = apps.get_model('main', 'TaskDay')
+    rows = []
+    tasks = Task.objects.values_list('pk', 'user_id', 'suggested_todo_datetime', 'deadline', 'created_at')
+    for pk, user_id, *dates in tasks.iterator(chunk_size=2000):
+        days = {}
+        for index, value in enumerate(dates):
+            if value is not None:
+                days.setdefault(timezone.localdate(value), [False, False, False])[index] = True
+        rows += [
+            TaskDay(user_id=user_id, task_id=pk, day=day, via_suggested=flags[0], via_deadline=flags[1], via_created=flags[2])
+            for day, flags in days.items()
+        ]
+        if len(rows) >= 2000:
+            TaskDay.objects.bulk_create(rows)
+            rows = []
+    TaskDay.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_task_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('via_suggested', models.BooleanField(default=False)),
+                ('via_deadline', models.BooleanField(default=False)),
+                ('via_created', models.BooleanField(default=False)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agenda_days', to='main.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'day'], name='main_taskda_user_id_a0e804_idx')],
+                'unique_together': {('task', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_task_days, migrations.RunPython.noop),
+    ]
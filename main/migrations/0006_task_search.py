@@ -0,0 +1,91 @@
+from django.db import migrations
+
+
+# The schema as of this migration, frozen here so later changes to main.search
+# don't rewrite history (0008 replaces the SQLite table)
+FTS_TABLE = 'main_task_fts'
+SEARCH_CONFIG = 'english'
+
+POSTGRES_SCHEMA = [
+    """
+    ALTER TABLE main_task ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{config}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{config}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS main_task_search_vector_idx ON main_task USING gin (search_vector)',
+]
+POSTGRES_DROP = [
+    'DROP INDEX CONCURRENTLY IF EXISTS main_task_search_vector_idx',
+    'ALTER TABLE main_task DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_SCHEMA = [
+    "CREATE VIRTUAL TABLE {fts} USING fts5(user, title, description, tokenize = 'porter unicode61')",
+    """
+    CREATE TRIGGER {fts}_insert AFTER INSERT ON main_task BEGIN
+        INSERT INTO {fts} (rowid, user, title, description)
+        VALUES (new.rowid, 'u' || new.user_id, new.title, coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER {fts}_update AFTER UPDATE OF user_id, title, description ON main_task BEGIN
+        UPDATE {fts} SET user = 'u' || new.user_id, title = new.title, description = coalesce(new.description, '')
+        WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER {fts}_delete AFTER DELETE ON main_task BEGIN
+        DELETE FROM {fts} WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    INSERT INTO {fts} (rowid, user, title, description)
+    SELECT rowid, 'u' || user_id, title, coalesce(description, '') FROM main_task
+    """,
+]
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS {fts}_insert',
+    'DROP TRIGGER IF EXISTS {fts}_update',
+    'DROP TRIGGER IF EXISTS {fts}_delete',
+    'DROP TABLE IF EXISTS {fts}',
+]
+
+
+def run(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement.format(fts=FTS_TABLE, config=SEARCH_CONFIG))
+
+
+def fts5_supported(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def forwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        run(connection, POSTGRES_SCHEMA)
+    elif connection.vendor == 'sqlite' and fts5_supported(connection):
+        run(connection, SQLITE_SCHEMA)
+
+
+def backwards(apps, schema_editor):
+    connection = schema_editor.connection
+    run(connection, {'postgresql': POSTGRES_DROP, 'sqlite': SQLITE_DROP}.get(connection.vendor, []))
+
+
+class Migration(migrations.Migration):
+
+    # The GIN index is built concurrently, which can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('main', '0005_task_days'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
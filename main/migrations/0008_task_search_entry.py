@@ -0,0 +1,158 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+import main.models
+
+
+# The SQLite schema as of this migration, frozen here so later changes to
+# main.search don't rewrite history. The FTS5 table is keyed by task id through
+# an external content table instead of the rowid of main_task.
+FTS_TABLE = 'main_task_fts'
+FTS_CONTENT_TABLE = 'main_task_search'
+
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE {content} (
+        id integer NOT NULL PRIMARY KEY,
+        task_id char(32) NOT NULL UNIQUE,
+        user text NOT NULL,
+        title text NOT NULL,
+        description text NOT NULL
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE {fts} USING fts5(
+        task_id UNINDEXED, user, title, description,
+        content = '{content}', content_rowid = 'id', tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    INSERT INTO {content} (task_id, user, title, description)
+    SELECT id, 'u' || user_id, title, coalesce(description, '') FROM main_task
+    """,
+    "INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+    """
+    CREATE TRIGGER {content}_insert AFTER INSERT ON {content} BEGIN
+        INSERT INTO {fts} (rowid, task_id, user, title, description)
+        VALUES (new.id, new.task_id, new.user, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER {content}_update AFTER UPDATE ON {content} BEGIN
+        INSERT INTO {fts} ({fts}, rowid, task_id, user, title, description)
+        VALUES ('delete', old.id, old.task_id, old.user, old.title, old.description);
+        INSERT INTO {fts} (rowid, task_id, user, title, description)
+        VALUES (new.id, new.task_id, new.user, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER {content}_delete AFTER DELETE ON {content} BEGIN
+        INSERT INTO {fts} ({fts}, rowid, task_id, user, title, description)
+        VALUES ('delete', old.id, old.task_id, old.user, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER {fts}_insert AFTER INSERT ON main_task BEGIN
+        INSERT INTO {content} (task_id, user, title, description)
+        VALUES (new.id, 'u' || new.user_id, new.title, coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER {fts}_update AFTER UPDATE OF user_id, title, description ON main_task BEGIN
+        UPDATE {content} SET user = 'u' || new.user_id, title = new.title, description = coalesce(new.description, '')
+        WHERE task_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER {fts}_delete AFTER DELETE ON main_task BEGIN
+        DELETE FROM {content} WHERE task_id = old.id;
+    END
+    """,
+]
+# Also drops the rowid-keyed table of 0006 (the same names, without the content table)
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS {fts}_insert',
+    'DROP TRIGGER IF EXISTS {fts}_update',
+    'DROP TRIGGER IF EXISTS {fts}_delete',
+    'DROP TRIGGER IF EXISTS {content}_insert',
+    'DROP TRIGGER IF EXISTS {content}_update',
+    'DROP TRIGGER IF EXISTS {content}_delete',
+    'DROP TABLE IF EXISTS {fts}',
+    'DROP TABLE IF EXISTS {content}',
+]
+
+# The rowid-keyed schema of 0006, restored when this migration is reversed
+ROWID_SQLITE_SCHEMA = [
+    "CREATE VIRTUAL TABLE {fts} USING fts5(user, title, description, tokenize = 'porter unicode61')",
+    """
+    CREATE TRIGGER {fts}_insert AFTER INSERT ON main_task BEGIN
+        INSERT INTO {fts} (rowid, user, title, description)
+        VALUES (new.rowid, 'u' || new.user_id, new.title, coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER {fts}_update AFTER UPDATE OF user_id, title, description ON main_task BEGIN
+        UPDATE {fts} SET user = 'u' || new.user_id, title = new.title, description = coalesce(new.description, '')
+        WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER {fts}_delete AFTER DELETE ON main_task BEGIN
+        DELETE FROM {fts} WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    INSERT INTO {fts} (rowid, user, title, description)
+    SELECT rowid, 'u' || user_id, title, coalesce(description, '') FROM main_task
+    """,
+]
+
+
+def run(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement.format(fts=FTS_TABLE, content=FTS_CONTENT_TABLE))
+
+
+def fts5_supported(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def key_search_index_by_task_id(apps, schema_editor):
+    # PostgreSQL's search_vector column is unchanged
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite' and fts5_supported(connection):
+        run(connection, SQLITE_DROP)
+        run(connection, SQLITE_SCHEMA)
+
+
+def key_search_index_by_rowid(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite' and fts5_supported(connection):
+        run(connection, SQLITE_DROP)
+        run(connection, ROWID_SQLITE_SCHEMA)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskSearchEntry',
+            fields=[
+                ('task', models.OneToOneField(db_column='task_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='main.task')),
+                ('document', main.models.FullTextDocumentField(db_column='main_task_fts')),
+            ],
+            options={
+                'db_table': 'main_task_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(key_search_index_by_task_id, key_search_index_by_rowid),
+    ]
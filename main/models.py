@@ -1,8 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q, Count, Case, When, F, Value, ExpressionWrapper, DateTimeField, DurationField, Subquery
+from django.db.models.functions import Greatest, TruncDay, TruncMinute
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 import uuid
 
+from .cache import bump_data_version_on_commit
+
 User = get_user_model()
 
 # Priority choices for tasks
@@ -31,19 +35,262 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_default = models.BooleanField(default=False)  # For personal project
+    # Task counters, kept up to date by task writes. overdue_count only changes on
+    # writes, so run `manage.py reconcile_project_counts` periodically to catch
+    # deadlines passing.
+    task_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    overdue_count = models.IntegerField(default=0)
+    # Value of the owner's ChangeSequence when the row was last written (delta sync)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    COUNTER_FIELDS = ('task_count', 'pending_count', 'completed_count', 'overdue_count')
 
     class Meta:
         unique_together = ['user', 'name']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'updated_at']),
+            models.Index(fields=['user', 'change_seq']),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.user.email}"
 
     def save(self, *args, **kwargs):
-        # Ensure only one default project per user
-        if self.is_default:
-            Project.objects.filter(user=self.user, is_default=True).update(is_default=False)
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            update_fields = ChangeSequence.stamp(self, kwargs.get('update_fields'))
+            # Ensure only one default project per user
+            if self.is_default:
+                Project.objects.filter(user=self.user, is_default=True).update(
+                    is_default=False, change_seq=self.change_seq
+                )
+            if not self._state.adding and update_fields is None:
+                # Never write back counters loaded earlier, they may have moved since
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name not in self.COUNTER_FIELDS
+                ]
+            kwargs['update_fields'] = update_fields
+            super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        """
+        Delete the project with its tasks, writing the tombstones of the project,
+        its tasks and their orders with one INSERT
+        """
+        with transaction.atomic(using=using or self._state.db):
+            change_seq = ChangeSequence.next_value(self.user_id)
+            task_ids = Task.objects.filter(project=self).order_by().values_list('pk', flat=True)
+            order_ids = TaskOrder.objects.filter(task__project=self).order_by().values_list('pk', flat=True)
+            DeletionLog.objects.bulk_create([
+                DeletionLog(user_id=self.user_id, model='project', object_id=str(self.pk), change_seq=change_seq),
+                *(DeletionLog(user_id=self.user_id, model='task', object_id=str(pk), change_seq=change_seq) for pk in task_ids),
+                *(DeletionLog(user_id=self.user_id, model='task_order', object_id=str(pk), change_seq=change_seq) for pk in order_ids),
+            ], batch_size=500)
+            self._deletions_recorded = True
+            deleted = super().delete(using, keep_parents)
+            bump_data_version_on_commit(self.user_id)
+        return deleted
+
+    @staticmethod
+    def apply_task_count_changes(change_seq, old_state=None, new_state=None):
+        """
+        Update the counters of the projects affected by a task going from
+        `old_state` to `new_state` (see Task.counter_state, None when the task
+        doesn't exist on that side) with F() expressions, stamping the projects
+        with `change_seq`.
+        """
+        Project.apply_bulk_task_count_changes([(old_state, new_state)], change_seq)
+
+    @staticmethod
+    def apply_bulk_task_count_changes(changes, change_seq):
+        """
+        Same as apply_task_count_changes for many (old_state, new_state) pairs of
+        one user's tasks, with one UPDATE per affected project. updated_at and
+        change_seq move too, so delta sync sends the new counters.
+        """
+        now = timezone.now()
+        deltas = {}
+        for state, sign in (pair for old_state, new_state in changes for pair in ((old_state, -1), (new_state, 1))):
+            if state is None:
+                continue
+            project_id, is_done, deadline = state
+            counts = deltas.setdefault(project_id, {})
+            fields = ['task_count', 'completed_count' if is_done else 'pending_count']
+            if not is_done and deadline is not None and deadline < now:
+                fields.append('overdue_count')
+            for field in fields:
+                counts[field] = counts.get(field, 0) + sign
+
+        for project_id, counts in deltas.items():
+            changes = {
+                field: Greatest(F(field) + delta, 0)
+                for field, delta in counts.items() if delta
+            }
+            if changes:
+                Project.objects.filter(pk=project_id).update(updated_at=now, change_seq=change_seq, **changes)
+
+
+def start_of_today(now=None):
+    """Return midnight (in the current timezone) of the day containing `now`"""
+    now = timezone.localtime(now or timezone.now())
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rolled_over_suggested_todo_datetime(today_start):
+    """
+    Expression moving suggested_todo_datetime onto the day starting at
+    `today_start` while keeping its time of day (seconds are dropped).
+    """
+    time_of_day = ExpressionWrapper(
+        TruncMinute('suggested_todo_datetime') - TruncDay('suggested_todo_datetime'),
+        output_field=DurationField()
+    )
+    return ExpressionWrapper(Value(today_start) + time_of_day, output_field=DateTimeField())
+
+
+def project_count_annotations(now=None):
+    """
+    Count() expressions recomputing each Project counter from its tasks,
+    keyed by counter field name
+    """
+    now = now or timezone.now()
+    return {
+        'task_count': Count('tasks'),
+        'pending_count': Count('tasks', filter=Q(tasks__is_done=False)),
+        'completed_count': Count('tasks', filter=Q(tasks__is_done=True)),
+        'overdue_count': Count('tasks', filter=Q(tasks__is_done=False, tasks__deadline__lt=now)),
+    }
+
+
+def deletions_recorded(origin):
+    """
+    Whether the delete that sent a post_delete signal (its `origin`) already
+    recorded its tombstones, project counter changes and data version bump in
+    bulk, leaving nothing for the per-row receivers to do
+    """
+    return getattr(origin, '_deletions_recorded', False)
+
+
+class TaskQuerySet(models.QuerySet):
+    """QuerySet helpers for Task"""
+
+    def delete(self):
+        """
+        Delete the tasks set-based. Their counted state is read under the row
+        locks, the project counters move with one UPDATE per project and the
+        tombstones of the tasks and their orders are written with one INSERT, so
+        the cost doesn't grow with the number of tasks.
+        """
+        if self.query.is_sliced:
+            raise TypeError("Cannot use 'limit' or 'offset' with delete().")
+        with transaction.atomic(using=self.db):
+            # The owners' sequences are locked before the tasks, like every write does
+            change_seqs = {
+                user_id: ChangeSequence.next_value(user_id)
+                for user_id in sorted(set(self.order_by().values_list('user_id', flat=True).distinct()))
+            }
+            rows = list(
+                Task.objects.using(self.db).filter(pk__in=self.values('pk')).order_by().select_for_update()
+                .values_list('pk', 'user_id', 'project_id', 'is_done', 'deadline')
+            )
+            if not rows:
+                return 0, {}
+            pks = [pk for pk, *_ in rows]
+            for user_id, change_seq in change_seqs.items():
+                Project.apply_bulk_task_count_changes(
+                    [(tuple(state), None) for _, owner_id, *state in rows if owner_id == user_id], change_seq
+                )
+
+            orders = TaskOrder.objects.filter(task_id__in=pks).order_by().values_list('pk', 'user_id')
+            DeletionLog.objects.bulk_create([
+                *(
+                    DeletionLog(user_id=user_id, model='task', object_id=str(pk), change_seq=change_seqs[user_id])
+                    for pk, user_id, *_ in rows
+                ),
+                *(
+                    DeletionLog(user_id=user_id, model='task_order', object_id=str(pk), change_seq=change_seqs[user_id])
+                    for pk, user_id in orders
+                ),
+            ], batch_size=500)
+
+            tasks = Task.objects.using(self.db).filter(pk__in=pks)
+            tasks._deletions_recorded = True
+            deleted = super(TaskQuerySet, tasks).delete()
+            for user_id in change_seqs:
+                bump_data_version_on_commit(user_id)
+        return deleted
+
+    def with_effective_suggested_todo_datetime(self, now=None):
+        """
+        Annotate `effective_suggested_todo_datetime`: the suggested datetime as
+        the user should see it. Pending tasks whose suggested date has passed
+        are rolled onto today (same time of day) without writing to the database.
+        """
+        today_start = start_of_today(now)
+        return self.annotate(
+            effective_suggested_todo_datetime=Case(
+                When(
+                    is_done=False,
+                    suggested_todo_datetime__lt=today_start,
+                    then=rolled_over_suggested_todo_datetime(today_start)
+                ),
+                default=F('suggested_todo_datetime'),
+                output_field=DateTimeField()
+            )
+        )
+
+    def on_day(self, user, day, include_created=False, now=None):
+        """
+        Filter tasks suggested for or due on `day` (optionally also those created on it).
+
+        Reads the user's TaskDay rows for the day. Pending tasks suggested on an
+        earlier day are listed on today instead, so past days only count completed
+        tasks through their suggested date, and today adds the pending tasks whose
+        suggested date has passed.
+        """
+        today_start = start_of_today(now)
+        listed = Q(via_deadline=True) | Q(via_suggested=True)
+        if day < today_start.date():
+            listed = Q(via_deadline=True) | Q(via_suggested=True, task__is_done=True)
+        if include_created:
+            listed |= Q(via_created=True)
+
+        agenda = TaskDay.objects.filter(listed, user=user, day=day).values('task_id')
+        condition = Q(pk__in=agenda)
+        if day == today_start.date():
+            # A subquery of its own, so it is answered from the pending-suggested index
+            rolled_over = Task.objects.filter(
+                user=user, is_done=False, suggested_todo_datetime__lt=today_start
+            ).values('pk')
+            condition |= Q(pk__in=rolled_over)
+        return self.filter(condition)
+
+    def on_days(self, user, start, end, now=None):
+        """
+        Tasks listed on any day from `start` to `end` (inclusive), with the TaskDay
+        row they matched through: one row per task and day, annotated with
+        `agenda_day` and the `via_*` flags. Past days still match pending tasks
+        suggested on them, and pending tasks suggested before the range match when
+        it includes today (their rollover day), so the rows need to be placed on
+        their days (like on_day does) by the caller.
+        """
+        today_start = start_of_today(now)
+        condition = Q(agenda_days__day__gte=start, agenda_days__day__lte=end)
+        if start <= today_start.date() <= end:
+            condition |= Q(
+                agenda_days__via_suggested=True,
+                agenda_days__day__lt=today_start.date(),
+                is_done=False
+            )
+        return self.filter(condition, agenda_days__user=user).annotate(
+            agenda_day=F('agenda_days__day'),
+            via_suggested=F('agenda_days__via_suggested'),
+            via_deadline=F('agenda_days__via_deadline'),
+            via_created=F('agenda_days__via_created'),
+        )
 
 
 class Task(models.Model):
@@ -60,20 +307,77 @@ class Task(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Value of the owner's ChangeSequence when the row was last written (delta sync)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    objects = TaskQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'updated_at']),
+            models.Index(fields=['user', 'change_seq']),
+            models.Index(fields=['user', 'is_done', 'created_at']),
+            models.Index(fields=['user', 'deadline']),
+            models.Index(fields=['user', 'suggested_todo_datetime']),
+            # Pending tasks: overdue checks and the rollover of past suggested dates
+            models.Index(fields=['user', 'deadline'], condition=Q(is_done=False), name='main_task_pending_deadline_idx'),
+            models.Index(fields=['user', 'suggested_todo_datetime'], condition=Q(is_done=False), name='main_task_pending_suggest_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.project.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._agenda_state = instance.agenda_state()
+        return instance
+
+    def counter_state(self):
+        """Fields the project counters depend on, or None if they aren't all loaded"""
+        if not all(name in self.__dict__ for name in ('project_id', 'is_done', 'deadline')):
+            return None
+        return (self.project_id, self.is_done, self.deadline)
+
+    def agenda_state(self):
+        """Dates the TaskDay rows depend on, or None if they aren't all loaded"""
+        if not all(name in self.__dict__ for name in ('suggested_todo_datetime', 'deadline', 'created_at')):
+            return None
+        return (self.suggested_todo_datetime, self.deadline, self.created_at)
+
     def save(self, *args, **kwargs):
         # Set datetime_done when task is marked as done
         if self.is_done and not self.datetime_done:
             self.datetime_done = timezone.now()
         elif not self.is_done and self.datetime_done:
             self.datetime_done = None
-        super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            kwargs['update_fields'] = ChangeSequence.stamp(self, kwargs.get('update_fields'))
+            if self._state.adding:
+                old_state = None
+            else:
+                # Read what the counters account for under the row lock: the state
+                # loaded with this instance may already be outdated by a concurrent
+                # save, whose delta would then be applied twice
+                old_state = Task.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'project_id', 'is_done', 'deadline'
+                ).first()
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            new_state = self.counter_state()
+            if old_state != new_state:
+                Project.apply_task_count_changes(self.change_seq, old_state, new_state)
+            agenda_state = self.agenda_state()
+            if adding or agenda_state != getattr(self, '_agenda_state', None):
+                TaskDay.sync_tasks([self])
+        self._agenda_state = agenda_state
+
+    def delete(self, using=None, keep_parents=False):
+        # Through TaskQuerySet.delete(), which reads the state the project counters
+        # account for under the row lock rather than trusting this instance's copy
+        return Task.objects.using(using or self._state.db).filter(pk=self.pk).delete()
 
     @property
     def priority_color(self):
@@ -81,6 +385,70 @@ class Task(models.Model):
         return PRIORITY_COLORS.get(self.priority, '#6B7280')  # Default gray
 
 
+def agenda_days(suggested_todo_datetime, deadline, created_at):
+    """
+    Map each day (in the current timezone) a task with these dates is listed on
+    to its [via_suggested, via_deadline, via_created] flags
+    """
+    days = {}
+    for index, value in enumerate((suggested_todo_datetime, deadline, created_at)):
+        if value is not None:
+            days.setdefault(timezone.localdate(value), [False, False, False])[index] = True
+    return days
+
+
+class TaskDay(models.Model):
+    """
+    The days a task is listed on: its suggested date, deadline and creation date.
+    Kept in step with the task dates on every write, so the `today` and `by_date`
+    lists read one indexed range instead of evaluating the dates of every task.
+    Pending tasks rolling over onto today are added when querying (see
+    TaskQuerySet.on_day).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_days')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='agenda_days')
+    day = models.DateField()
+    via_suggested = models.BooleanField(default=False)
+    via_deadline = models.BooleanField(default=False)
+    via_created = models.BooleanField(default=False)
+
+    # Task fields the rows are derived from
+    TASK_FIELDS = ('user_id', 'suggested_todo_datetime', 'deadline', 'created_at')
+
+    class Meta:
+        unique_together = ['task', 'day']
+        indexes = [
+            models.Index(fields=['user', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} on {self.day}"
+
+    @staticmethod
+    def rows_for(task):
+        """Unsaved TaskDay rows for a task's current dates"""
+        days = agenda_days(task.suggested_todo_datetime, task.deadline, task.created_at)
+        return [
+            TaskDay(
+                user_id=task.user_id, task_id=task.pk, day=day,
+                via_suggested=via_suggested, via_deadline=via_deadline, via_created=via_created
+            )
+            for day, (via_suggested, via_deadline, via_created) in days.items()
+        ]
+
+    @staticmethod
+    def sync_tasks(tasks):
+        """Replace the TaskDay rows of `tasks` with rows for their current dates"""
+        tasks = list(tasks)
+        if not tasks:
+            return
+        with transaction.atomic():
+            TaskDay.objects.filter(task__in=[task.pk for task in tasks]).delete()
+            TaskDay.objects.bulk_create(
+                [row for task in tasks for row in TaskDay.rows_for(task)], batch_size=500
+            )
+
+
 # Context choices for task ordering
 ORDER_CONTEXT_CHOICES = [
     ('all_tasks', 'All Tasks'),
@@ -90,6 +458,11 @@ ORDER_CONTEXT_CHOICES = [
 ]
 
 
+# Spacing between consecutive TaskOrder positions, leaving room to move a task
+# between two neighbours by writing a single row
+POSITION_GAP = 1024
+
+
 class TaskOrder(models.Model):
     """Model to store custom task ordering for different contexts"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_orders')
@@ -100,13 +473,138 @@ class TaskOrder(models.Model):
     position = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Value of the owner's ChangeSequence when the row was last written (delta sync)
+    change_seq = models.BigIntegerField(default=0, editable=False)
 
     class Meta:
         unique_together = ['user', 'context', 'reference', 'task']
         ordering = ['position']
         indexes = [
             models.Index(fields=['user', 'context', 'reference', 'position']),
+            models.Index(fields=['user', 'updated_at']),
+            models.Index(fields=['user', 'change_seq']),
         ]
 
     def __str__(self):
-        return f"{self.user.email} - {self.context} - {self.reference} - Task: {self.task.title} (pos: {self.position})"
\ No newline at end of file
+        return f"{self.user.email} - {self.context} - {self.reference} - Task: {self.task.title} (pos: {self.position})"
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            kwargs['update_fields'] = ChangeSequence.stamp(self, kwargs.get('update_fields'))
+            super().save(*args, **kwargs)
+
+
+# Models whose deletions are recorded for delta sync
+DELETION_MODEL_CHOICES = [
+    ('project', 'Project'),
+    ('task', 'Task'),
+    ('task_order', 'Task Order'),
+]
+
+
+class DeletionLog(models.Model):
+    """Tombstone of a deleted project, task or task order, read by the sync endpoint"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='deletion_logs')
+    model = models.CharField(max_length=20, choices=DELETION_MODEL_CHOICES)
+    object_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(default=timezone.now)
+    # Value of the owner's ChangeSequence when the object was deleted (delta sync)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+            models.Index(fields=['user', 'change_seq']),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted at {self.deleted_at}"
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            kwargs['update_fields'] = ChangeSequence.stamp(self, kwargs.get('update_fields'))
+            super().save(*args, **kwargs)
+
+
+class ChangeSequence(models.Model):
+    """
+    Per-user counter of data changes, the cursor of delta sync. Every write of a
+    project, task, task order or tombstone stamps the row's change_seq with a new
+    value, taken in the write's transaction. Taking a value locks the counter row
+    until that transaction commits, so a user's changes commit in sequence order:
+    once a value is committed, no change stamped with a lower one is still
+    pending. Taking it is the first lock of every write, so writers never wait on
+    each other in opposite orders.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='change_sequence')
+    value = models.BigIntegerField(default=0)
+    # Highest change_seq of the tombstones pruned so far: sync tokens before it can't be served
+    pruned_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} at {self.value}"
+
+    @classmethod
+    def advance(cls, user_ids):
+        """
+        Move the sequences of these users forward (creating the missing ones),
+        locking them until the transaction commits
+        """
+        user_ids = sorted(set(user_ids))
+        sequences = cls.objects.filter(user_id__in=user_ids)
+        if sequences.update(value=F('value') + 1) < len(user_ids):
+            # Skipping a value of the existing sequences is harmless, only the order counts
+            cls.objects.bulk_create([cls(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+            sequences.update(value=F('value') + 1)
+
+    @classmethod
+    def next_value(cls, user_id):
+        """Move the user's sequence forward and return its new value (call it inside the write's transaction)"""
+        cls.advance([user_id])
+        return cls.objects.filter(user_id=user_id).values_list('value', flat=True).get()
+
+    @classmethod
+    def current_value(cls, user_ref):
+        """Subquery of the sequence value of the user `user_ref` (an OuterRef), for stamping set-based updates"""
+        return Subquery(cls.objects.filter(user_id=user_ref).values('value')[:1])
+
+    @classmethod
+    def stamp(cls, instance, update_fields=None):
+        """
+        Stamp a row about to be saved with a new value of its owner's sequence,
+        returning `update_fields` with change_seq added
+        """
+        instance.change_seq = cls.next_value(instance.user_id)
+        return None if update_fields is None else {*update_fields, 'change_seq'}
+
+
+class FullTextDocumentField(models.TextField):
+    """The hidden column named after an FTS5 table, the target of MATCH queries"""
+
+
+@FullTextDocumentField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class TaskSearchEntry(models.Model):
+    """
+    A task's row in the SQLite full-text search table. The table and the
+    triggers keeping it in step with main_task are created by main.search, not
+    by migrations, and only exist on SQLite.
+    """
+    task = models.OneToOneField(
+        Task, on_delete=models.DO_NOTHING, primary_key=True, db_constraint=False,
+        db_column='task_id', related_name='search_entry'
+    )
+    document = FullTextDocumentField(db_column='main_task_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'main_task_fts'
@@ -0,0 +1,139 @@
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from datetime import datetime, date
+from functools import reduce
+import base64
+import json
+import operator
+import uuid
+
+
+# Sort keys used by the task list endpoints: (field, descending, nullable).
+# Every key ends with the primary key so the order is total.
+CUSTOM_ORDER_KEYSET = [('custom_position', False, True), ('created_at', True, False), ('id', False, False)]
+CREATED_AT_KEYSET = [('created_at', True, False), ('id', False, False)]
+DEADLINE_KEYSET = [('deadline', False, False), ('id', False, False)]
+SEARCH_KEYSET = [('search_rank', True, False), ('created_at', True, False), ('id', False, False)]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque cursor (keyset) pagination over an explicit sort key.
+
+    The cursor stores the sort values of the last returned row and the next page
+    is fetched with a WHERE clause on them, so deep pages cost the same as the
+    first one. Pagination is only applied when the client sends `page_size` or
+    `cursor`; other requests keep receiving the full, unpaginated list.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, keyset):
+        self.keyset = keyset
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            try:
+                queryset = queryset.filter(self.keyset_filter(self.decode_cursor(encoded)))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        rows = list(queryset.order_by(*self.get_ordering())[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_ordering(self):
+        ordering = []
+        for field, descending, nullable in self.keyset:
+            expression = F(field)
+            ordering.append(expression.desc(nulls_last=True) if descending else expression.asc(nulls_last=True))
+        return ordering
+
+    def keyset_filter(self, values):
+        """
+        Rows sorting after `values`: for each key, all previous keys equal and
+        this key strictly after the cursor (NULLs sort last).
+        """
+        if len(values) != len(self.keyset):
+            raise NotFound(self.invalid_cursor_message)
+
+        conditions = []
+        equal = Q()
+        for (field, descending, nullable), value in zip(self.keyset, values):
+            if value is not None:
+                after = Q(**{f'{field}__{"lt" if descending else "gt"}': value})
+                if nullable:
+                    after |= Q(**{f'{field}__isnull': True})
+                conditions.append(equal & after)
+                equal &= Q(**{field: value})
+            else:
+                # Nothing sorts after NULL within this key
+                equal &= Q(**{f'{field}__isnull': True})
+        return reduce(operator.or_, conditions) if conditions else Q(pk__in=[])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [self.get_value(last, field) for field, _, _ in self.keyset]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    @staticmethod
+    def get_value(row, field):
+        if isinstance(row, dict):
+            return row[field]
+        return getattr(row, field)
+
+    @staticmethod
+    def encode_cursor(values):
+        def default(value):
+            if isinstance(value, (datetime, date)):
+                return value.isoformat()
+            if isinstance(value, uuid.UUID):
+                return str(value)
+            raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+        payload = json.dumps(values, default=default, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, encoded):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list):
+            raise NotFound(self.invalid_cursor_message)
+        return values
@@ -0,0 +1,131 @@
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+import csv
+import io
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library encoder
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    Output matches JSONRenderer for compact, non-indented responses (values orjson
+    doesn't know, like Decimal or datetimes, go through DRF's encoder). Indented
+    output (browsable API, `indent=` media type parameter) uses JSONRenderer.
+    """
+    orjson_options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.orjson_options)
+        except TypeError:
+            # e.g. integers wider than 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep JSONRenderer's escaping of the JavaScript line separators
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+        return ret
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON (`format=ndjson`). Exports stream their records
+    themselves; this renders other responses, such as errors, as a single line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return FastJSONRenderer().render(data) + b'\n'
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    CSV (`format=csv`). Exports stream their rows themselves; this renders other
+    responses, such as errors, as a header row and a value row.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not isinstance(data, dict):
+            data = {'detail': data}
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(data.keys())
+        writer.writerow(data.values())
+        return output.getvalue().encode(self.charset)
+
+
+class JSONStream:
+    """An iterable that stream_json() writes as a JSON array, one element at a time"""
+
+    def __init__(self, iterable):
+        self.iterable = iterable
+
+
+def stream_json(data, buffer_size=64 * 1024):
+    """
+    Encode `data` incrementally, yielding chunks of about `buffer_size` bytes.
+    JSONStream values (at the top level or directly inside a dict) are consumed
+    lazily, so memory use doesn't grow with their length.
+    """
+    return buffer_chunks(_iter_json(data, FastJSONRenderer()), buffer_size)
+
+
+def buffer_chunks(pieces, buffer_size=64 * 1024):
+    """Join small byte strings into chunks of about `buffer_size` bytes"""
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) >= buffer_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _iter_json(value, renderer):
+    if isinstance(value, JSONStream):
+        yield b'['
+        for index, item in enumerate(value.iterable):
+            if index:
+                yield b','
+            yield from _iter_json(item, renderer)
+        yield b']'
+    elif isinstance(value, dict) and any(isinstance(item, JSONStream) for item in value.values()):
+        yield b'{'
+        for index, (key, item) in enumerate(value.items()):
+            if index:
+                yield b','
+            yield renderer.render(key)
+            yield b':'
+            yield from _iter_json(item, renderer)
+        yield b'}'
+    elif value is None:
+        yield b'null'  # render() returns an empty body for None
+    else:
+        yield renderer.render(value)
+
+
+def streaming_json_response(data):
+    """StreamingHttpResponse writing `data` with stream_json()"""
+    return StreamingHttpResponse(stream_json(data), content_type=FastJSONRenderer.media_type)
@@ -0,0 +1,226 @@
+"""
+Full-text search over task titles and descriptions.
+
+PostgreSQL matches against the `search_vector` tsvector column (a generated
+column with a GIN index, see migration 0006) and ranks with ts_rank. SQLite
+matches against the `main_task_fts` FTS5 table (the TaskSearchEntry model), kept
+in sync with main_task by triggers, and ranks with bm25. Other databases fall
+back to an unranked icontains scan.
+"""
+from django.db import connections, transaction
+from django.db.models import F, Func, Q, Value, FloatField, BooleanField
+from django.db.models.expressions import RawSQL
+import re
+
+from .models import Task, TaskSearchEntry
+
+
+SEARCH_CONFIG = 'english'
+FTS_TABLE = TaskSearchEntry._meta.db_table
+FTS_CONTENT_TABLE = 'main_task_search'
+
+# Adding the stored generated column rewrites main_task under an ACCESS EXCLUSIVE
+# lock, blocking reads and writes of tasks until every row is computed: apply
+# migration 0006 on a large table in a maintenance window.
+POSTGRES_SCHEMA = [
+    """
+    ALTER TABLE main_task ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{config}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{config}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS main_task_search_vector_idx ON main_task USING gin (search_vector)',
+]
+POSTGRES_DROP = [
+    'DROP INDEX CONCURRENTLY IF EXISTS main_task_search_vector_idx',
+    'ALTER TABLE main_task DROP COLUMN IF EXISTS search_vector',
+]
+
+# The FTS5 table indexes the rows of main_task_search, which hold each task's id
+# and its owner as a `u<id>` token, so a search only walks the posting lists of
+# that user's tasks and joins back to main_task on the task id. FTS rows are
+# keyed by the integer primary key of main_task_search, which VACUUM keeps, and
+# its unique task_id index lets the main_task triggers find a task's row without
+# scanning the FTS table. A migration SQLite applies by copying main_task drops
+# the main_task triggers, restore_search_triggers() puts the index back after
+# `migrate` (see main.signals).
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE {content} (
+        id integer NOT NULL PRIMARY KEY,
+        task_id char(32) NOT NULL UNIQUE,
+        user text NOT NULL,
+        title text NOT NULL,
+        description text NOT NULL
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE {fts} USING fts5(
+        task_id UNINDEXED, user, title, description,
+        content = '{content}', content_rowid = 'id', tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    INSERT INTO {content} (task_id, user, title, description)
+    SELECT id, 'u' || user_id, title, coalesce(description, '') FROM main_task
+    """,
+    "INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+    """
+    CREATE TRIGGER {content}_insert AFTER INSERT ON {content} BEGIN
+        INSERT INTO {fts} (rowid, task_id, user, title, description)
+        VALUES (new.id, new.task_id, new.user, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER {content}_update AFTER UPDATE ON {content} BEGIN
+        INSERT INTO {fts} ({fts}, rowid, task_id, user, title, description)
+        VALUES ('delete', old.id, old.task_id, old.user, old.title, old.description);
+        INSERT INTO {fts} (rowid, task_id, user, title, description)
+        VALUES (new.id, new.task_id, new.user, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER {content}_delete AFTER DELETE ON {content} BEGIN
+        INSERT INTO {fts} ({fts}, rowid, task_id, user, title, description)
+        VALUES ('delete', old.id, old.task_id, old.user, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER {fts}_insert AFTER INSERT ON main_task BEGIN
+        INSERT INTO {content} (task_id, user, title, description)
+        VALUES (new.id, 'u' || new.user_id, new.title, coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER {fts}_update AFTER UPDATE OF user_id, title, description ON main_task BEGIN
+        UPDATE {content} SET user = 'u' || new.user_id, title = new.title, description = coalesce(new.description, '')
+        WHERE task_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER {fts}_delete AFTER DELETE ON main_task BEGIN
+        DELETE FROM {content} WHERE task_id = old.id;
+    END
+    """,
+]
+# Also drops the rowid-keyed table of migration 0006 (the same names, without
+# the content table)
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS {fts}_insert',
+    'DROP TRIGGER IF EXISTS {fts}_update',
+    'DROP TRIGGER IF EXISTS {fts}_delete',
+    'DROP TRIGGER IF EXISTS {content}_insert',
+    'DROP TRIGGER IF EXISTS {content}_update',
+    'DROP TRIGGER IF EXISTS {content}_delete',
+    'DROP TABLE IF EXISTS {fts}',
+    'DROP TABLE IF EXISTS {content}',
+]
+
+
+def create_search_index(connection):
+    """Create (and fill) the search index of the database behind `connection`"""
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_SCHEMA
+    elif connection.vendor == 'sqlite' and fts5_supported(connection):
+        statements = SQLITE_SCHEMA
+    else:
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement.format(fts=FTS_TABLE, content=FTS_CONTENT_TABLE, config=SEARCH_CONFIG))
+    _fts_tables.pop(connection.alias, None)
+
+
+def drop_search_index(connection):
+    statements = {'postgresql': POSTGRES_DROP, 'sqlite': SQLITE_DROP}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement.format(fts=FTS_TABLE, content=FTS_CONTENT_TABLE, config=SEARCH_CONFIG))
+    _fts_tables.pop(connection.alias, None)
+
+
+def restore_search_triggers(connection):
+    """
+    Rebuild the SQLite search index when main_task has lost its triggers, which
+    SQLite drops whenever a migration remakes the table. Returns True when the
+    index was rebuilt.
+    """
+    if connection.vendor != 'sqlite' or not fts_available(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [Task._meta.db_table]
+        )
+        present = {name for name, in cursor.fetchall()}
+    if {f'{FTS_TABLE}_insert', f'{FTS_TABLE}_update', f'{FTS_TABLE}_delete'} <= present:
+        return False
+    # Tasks written since the triggers were dropped are missing from the index
+    with transaction.atomic(using=connection.alias):
+        drop_search_index(connection)
+        create_search_index(connection)
+    return True
+
+
+def fts5_supported(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+_fts_tables = {}
+
+
+def fts_available(connection):
+    """True when the SQLite FTS5 table exists (FTS5 can be missing from a SQLite build)"""
+    if connection.alias not in _fts_tables:
+        with connection.cursor() as cursor:
+            _fts_tables[connection.alias] = FTS_TABLE in connection.introspection.table_names(cursor)
+    return _fts_tables[connection.alias]
+
+
+def fts5_query(user, query):
+    """
+    FTS5 MATCH expression for the user's tasks containing every word of `query`
+    in their title or description, or None when `query` has no words
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    phrases = ' '.join('"%s"' % word for word in words)
+    return f'user: "u{user.pk}" AND {{title description}}: ({phrases})'
+
+
+def search_tasks(tasks, user, query):
+    """
+    Filter `tasks` (of `user`) to those matching `query` and annotate
+    `search_rank` (higher is more relevant; title matches weigh more)
+    """
+    connection = connections[tasks.db]
+    table = Task._meta.db_table
+
+    if connection.vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return tasks.filter(
+            RawSQL(f'"{table}"."search_vector" @@ {tsquery}', (query,), output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f'ts_rank("{table}"."search_vector", {tsquery})', (query,), output_field=FloatField())
+        )
+
+    if connection.vendor == 'sqlite' and fts_available(connection):
+        match = fts5_query(user, query)
+        if match is None:
+            return tasks.none()
+        # Joined on the task id so the FTS table drives the query and bm25() is
+        # computed once per match (bm25 is lower for better matches; the task_id
+        # and user columns get no weight)
+        return tasks.filter(search_entry__document__match=match).annotate(
+            search_rank=-Func(
+                F('search_entry__document'), Value(0.0), Value(0.0), Value(10.0), Value(5.0),
+                function='bm25', output_field=FloatField()
+            )
+        )
+
+    condition = Q()
+    for word in query.split():
+        condition &= Q(title__icontains=word) | Q(description__icontains=word)
+    return tasks.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
@@ -1,19 +1,44 @@
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from django.utils import timezone
+from django.utils.functional import cached_property
 from .models import Project, Task, TaskOrder, PRIORITY_CHOICES, PRIORITY_COLORS
 import uuid
 
 
+def get_datetime_formatter():
+    """
+    Function formatting datetimes like DRF's DateTimeField (in the current
+    timezone), without building a field object per value
+    """
+    output_format = api_settings.DATETIME_FORMAT
+    if output_format is None or output_format.lower() != 'iso-8601':
+        field = serializers.DateTimeField()
+        return lambda value: field.to_representation(value) if value else None
+    current_timezone = timezone.get_current_timezone()
+    
+    def format_datetime(value):
+        if not value:
+            return None
+        value = value.astimezone(current_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    
+    return format_datetime
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     """Serializer for Project model"""
-    task_count = serializers.SerializerMethodField()
-    
     class Meta:
         model = Project
         fields = [
             'id', 'name', 'description', 'color_code', 'user', 
-            'created_at', 'updated_at', 'is_default', 'task_count'
+            'created_at', 'updated_at', 'is_default', 'task_count',
+            'pending_count', 'completed_count', 'overdue_count'
+        ]
+        read_only_fields = [
+            'id', 'user', 'created_at', 'updated_at', 'task_count',
+            'pending_count', 'completed_count', 'overdue_count'
         ]
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at']
     
     def to_representation(self, instance):
         """Convert UUID to string for JSON serialization"""
@@ -24,10 +49,6 @@ class ProjectSerializer(serializers.ModelSerializer):
             data['user'] = str(data['user'])
         return data
     
-    def get_task_count(self, obj):
-        """Get the count of tasks in this project"""
-        return obj.tasks.count()
-    
     def create(self, validated_data):
         """Create a new project for the authenticated user"""
         validated_data['user'] = self.context['request'].user
@@ -59,6 +80,13 @@ class TaskSerializer(serializers.ModelSerializer):
             data['project'] = str(data['project'])
         if 'user' in data:
             data['user'] = str(data['user'])
+        # Expose the rolled-over suggested datetime when the queryset provides it
+        if hasattr(instance, 'effective_suggested_todo_datetime'):
+            effective = instance.effective_suggested_todo_datetime
+            data['suggested_todo_datetime'] = (
+                self.fields['suggested_todo_datetime'].to_representation(effective)
+                if effective is not None else None
+            )
         return data
     
     def create(self, validated_data):
@@ -67,6 +95,52 @@ class TaskSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class TaskReadSerializer(serializers.BaseSerializer):
+    """
+    Read-only equivalent of TaskSerializer for task lists.
+    
+    Serializes `.values()` rows (see `rows()`) with the project joined in the same
+    query, and writes the dicts directly instead of going through a field object
+    per attribute. The output is identical to TaskSerializer's.
+    """
+    VALUE_FIELDS = (
+        'id', 'title', 'description', 'priority', 'deadline', 'suggested_todo_datetime',
+        'is_done', 'datetime_done', 'project_id', 'project__name', 'project__color_code',
+        'user_id', 'created_at', 'updated_at'
+    )
+    PRIORITY_COLORS = {value: PRIORITY_COLORS.get(value, '#6B7280') for value, _ in PRIORITY_CHOICES}
+    
+    @classmethod
+    def rows(cls, queryset):
+        """`.values()` rows of `queryset`, keeping its annotations (ordering keys, effective date)"""
+        return queryset.values(*cls.VALUE_FIELDS, *queryset.query.annotations)
+    
+    def to_representation(self, row):
+        format_datetime = self.format_datetime
+        suggested = row.get('effective_suggested_todo_datetime', row['suggested_todo_datetime'])
+        return {
+            'id': str(row['id']),
+            'title': row['title'],
+            'description': row['description'],
+            'priority': row['priority'],
+            'priority_color': self.PRIORITY_COLORS.get(row['priority'], '#6B7280'),
+            'deadline': format_datetime(row['deadline']),
+            'suggested_todo_datetime': format_datetime(suggested),
+            'is_done': row['is_done'],
+            'datetime_done': format_datetime(row['datetime_done']),
+            'project': str(row['project_id']),
+            'project_name': row['project__name'],
+            'project_color': row['project__color_code'],
+            'user': str(row['user_id']),
+            'created_at': format_datetime(row['created_at']),
+            'updated_at': format_datetime(row['updated_at']),
+        }
+    
+    @cached_property
+    def format_datetime(self):
+        return get_datetime_formatter()
+
+
 class TaskCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating tasks with simplified fields"""
     
@@ -104,36 +178,64 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
+class BatchTaskDataSerializer(serializers.ModelSerializer):
+    """
+    Task fields of a batch create/update operation. The project is only parsed
+    here; the view checks all referenced projects in one query.
+    """
+    project = serializers.UUIDField(required=False)
+    
+    class Meta:
+        model = Task
+        fields = [
+            'title', 'description', 'priority', 'deadline',
+            'suggested_todo_datetime', 'is_done', 'project'
+        ]
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    """A single operation of a batch request"""
+    op = serializers.ChoiceField(choices=['create', 'update', 'delete'])
+    id = serializers.UUIDField(required=False, help_text="Task id (required for update/delete, optional client-generated id for create)")
+    data = serializers.DictField(required=False, help_text="Task fields for create/update")
+    
+    def validate(self, attrs):
+        if attrs['op'] in ['update', 'delete'] and not attrs.get('id'):
+            raise serializers.ValidationError({'id': f"id is required for {attrs['op']}"})
+        if attrs['op'] in ['create', 'update'] and not attrs.get('data'):
+            raise serializers.ValidationError({'data': f"data is required for {attrs['op']}"})
+        return attrs
+
+
+class BatchTasksSerializer(serializers.Serializer):
+    """Serializer for batch task mutations"""
+    operations = serializers.ListField(
+        child=serializers.DictField(),
+        min_length=1,
+        max_length=500,
+        help_text="List of {op, id, data} operations, applied in one transaction"
+    )
+
+
 class ProjectTaskSerializer(serializers.ModelSerializer):
     """Serializer for projects with their tasks"""
     tasks = TaskSerializer(many=True, read_only=True)
-    task_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Project
         fields = [
             'id', 'name', 'description', 'color_code', 
             'created_at', 'updated_at', 'is_default', 
-            'tasks', 'task_count'
+            'tasks', 'task_count', 'pending_count', 'completed_count', 'overdue_count'
         ]
+        read_only_fields = ['task_count', 'pending_count', 'completed_count', 'overdue_count']
     
     def to_representation(self, instance):
         """Convert UUID to string for JSON serialization"""
-        # Import here to avoid circular imports
-        from .views import update_expired_suggested_todo_datetime
-        
-        # Update expired suggested_todo_datetime for project tasks
-        tasks_list = list(instance.tasks.all())
-        update_expired_suggested_todo_datetime(tasks_list)
-        
         data = super().to_representation(instance)
         if 'id' in data:
             data['id'] = str(data['id'])
         return data
-    
-    def get_task_count(self, obj):
-        """Get the count of tasks in this project"""
-        return obj.tasks.count()
 
 
 class TaskOrderSerializer(serializers.ModelSerializer):
@@ -156,6 +258,30 @@ class TaskOrderSerializer(serializers.ModelSerializer):
         return data
 
 
+class TaskOrderReadSerializer(serializers.BaseSerializer):
+    """Read-only serializer for TaskOrder `.values()` rows (see `rows()`), used by export and sync"""
+    VALUE_FIELDS = ('id', 'context', 'reference', 'task_id', 'position', 'created_at', 'updated_at')
+    
+    @classmethod
+    def rows(cls, queryset):
+        return queryset.values(*cls.VALUE_FIELDS)
+    
+    @cached_property
+    def format_datetime(self):
+        return get_datetime_formatter()
+    
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'context': row['context'],
+            'reference': row['reference'],
+            'task': str(row['task_id']),
+            'position': row['position'],
+            'created_at': self.format_datetime(row['created_at']),
+            'updated_at': self.format_datetime(row['updated_at']),
+        }
+
+
 class ReorderTasksSerializer(serializers.Serializer):
     """Serializer for reordering tasks"""
     context = serializers.ChoiceField(choices=['all_tasks', 'by_project', 'today', 'by_date'])
@@ -165,3 +291,16 @@ class ReorderTasksSerializer(serializers.Serializer):
         min_length=1,
         help_text="List of task IDs in the desired order"
     )
+
+
+class MoveTaskSerializer(serializers.Serializer):
+    """Serializer for moving a single task between two neighbours"""
+    context = serializers.ChoiceField(choices=['all_tasks', 'by_project', 'today', 'by_date'])
+    reference = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    after_id = serializers.UUIDField(required=False, allow_null=True, help_text="Task that should precede the moved task")
+    before_id = serializers.UUIDField(required=False, allow_null=True, help_text="Task that should follow the moved task")
+    
+    def validate(self, attrs):
+        if not attrs.get('after_id') and not attrs.get('before_id'):
+            raise serializers.ValidationError('Provide after_id and/or before_id')
+        return attrs
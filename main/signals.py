@@ -1,7 +1,12 @@
-from django.db.models.signals import post_save
+from django.apps import apps
+from django.db import connections
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.db.models.query import QuerySet
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Project
+from .models import Project, Task, TaskOrder, DeletionLog, deletions_recorded
+from .cache import bump_data_version_on_commit
+from .search import restore_search_triggers
 
 User = get_user_model()
 
@@ -17,3 +22,42 @@ def create_default_project(sender, instance, created, **kwargs):
             user=instance,
             is_default=True
         )
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=TaskOrder)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=TaskOrder)
+def bump_user_data_version(sender, instance, origin=None, **kwargs):
+    """Invalidate the owner's collection ETags when their data changes"""
+    if deletions_recorded(origin):
+        return
+    bump_data_version_on_commit(instance.user_id)
+
+
+DELETION_MODELS = {Project: 'project', Task: 'task', TaskOrder: 'task_order'}
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=TaskOrder)
+def record_deletion(sender, instance, origin=None, **kwargs):
+    """Leave a tombstone so syncing clients learn about the deletion"""
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model is User or deletions_recorded(origin):
+        # The whole account is going away (tombstones included), or the
+        # tombstones were written in bulk
+        return
+    DeletionLog.objects.create(
+        user_id=instance.user_id,
+        model=DELETION_MODELS[sender],
+        object_id=str(instance.pk)
+    )
+
+
+@receiver(post_migrate, sender=apps.get_app_config('main'))
+def restore_task_search_triggers(sender, using, **kwargs):
+    """SQLite drops the search triggers of main_task whenever a migration remakes the table"""
+    restore_search_triggers(connections[using])
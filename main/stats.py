@@ -0,0 +1,61 @@
+"""
+Task counts for dashboards and badges, computed by the database with
+conditional aggregates instead of downloading task lists.
+"""
+from django.db.models import Count, Q
+from django.utils import timezone
+from datetime import timedelta
+
+from .models import Task, PRIORITY_CHOICES, start_of_today
+
+
+STATS_SECTIONS = ('totals', 'by_project', 'by_priority')
+
+
+def task_count_annotations(now=None):
+    """Count() expressions of the task statistics, keyed by name"""
+    now = now or timezone.now()
+    today_start = start_of_today(now)
+    pending = Q(is_done=False)
+    return {
+        'total': Count('id'),
+        'pending': Count('id', filter=pending),
+        'completed': Count('id', filter=Q(is_done=True)),
+        'overdue': Count('id', filter=pending & Q(deadline__lt=now)),
+        'due_today': Count('id', filter=pending & Q(deadline__gte=today_start, deadline__lt=today_start + timedelta(days=1))),
+        # Same window as /tasks/upcoming_deadlines/
+        'due_this_week': Count('id', filter=pending & Q(deadline__gte=now, deadline__lte=now + timedelta(days=7))),
+    }
+
+
+def task_stats(user, sections=STATS_SECTIONS, now=None):
+    """
+    Task counts of `user` for the requested sections: `totals`, `by_project`
+    (keyed by project id, projects without tasks are left out) and `by_priority`.
+    Only totals is a single aggregate; the other sections share one query
+    grouped by project and priority, which the totals are summed from.
+    """
+    annotations = task_count_annotations(now)
+    tasks = Task.objects.filter(user=user).order_by()
+    if set(sections) <= {'totals'}:
+        return {'totals': tasks.aggregate(**annotations)}
+
+    empty = dict.fromkeys(annotations, 0)
+    totals = dict(empty)
+    by_project = {}
+    by_priority = {priority: dict(empty) for priority, _ in PRIORITY_CHOICES}
+    rows = tasks.values('project_id', 'project__name', 'project__color_code', 'priority').annotate(**annotations)
+    for row in rows:
+        project = by_project.setdefault(str(row['project_id']), {
+            'name': row['project__name'],
+            'color_code': row['project__color_code'],
+            **empty,
+        })
+        priority = by_priority.setdefault(row['priority'], dict(empty))
+        for name in annotations:
+            totals[name] += row[name]
+            project[name] += row[name]
+            priority[name] += row[name]
+
+    stats = {'totals': totals, 'by_project': by_project, 'by_priority': by_priority}
+    return {section: stats[section] for section in sections}
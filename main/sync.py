@@ -0,0 +1,101 @@
+"""
+Delta sync: the projects, tasks and task orders that changed since a client's
+last sync, plus tombstones for what was deleted.
+
+A sync token holds a value of the user's ChangeSequence and the day the sync
+ran on. Every write stamps its rows with a new sequence value taken in its
+transaction, and the sequence row stays locked until that transaction commits,
+so every change stamped at or below the committed value has committed too.
+A sync reads that value first and returns the rows stamped after the token up
+to it: nothing is missed, however long a write transaction runs, and nothing
+is sent twice (rows rolling over to a new day aside).
+"""
+from django.db.models import Q
+from django.utils import timezone
+from datetime import date
+import base64
+import json
+
+from .models import Project, Task, TaskOrder, DeletionLog, ChangeSequence, start_of_today
+from .serializers import ProjectSerializer, TaskReadSerializer, TaskOrderReadSerializer
+
+
+def encode_sync_token(change_seq, day):
+    payload = json.dumps({'seq': change_seq, 'day': day.isoformat()}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_sync_token(token):
+    """
+    Return (change_seq, day) from a sync token, raising ValueError when it is
+    malformed. Tokens issued before the change sequence (which held a time)
+    decode to (None, None), a full resync.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+        if 'seq' not in payload and 'since' in payload:
+            return None, None
+        change_seq = payload['seq']
+        day = date.fromisoformat(payload['day'])
+    except (TypeError, KeyError, ValueError, UnicodeError):
+        raise ValueError('Invalid sync token')
+    if type(change_seq) is not int or change_seq < 0:
+        raise ValueError('Invalid sync token')
+    return change_seq, day
+
+
+def collect_changes(user, token=None):
+    """
+    Changes of the user's data since `token` (everything when there is no token,
+    or when it is older than the tombstone retention). Raises ValueError for an
+    invalid token.
+    """
+    now = timezone.now()
+    today_start = start_of_today(now)
+    # Read before the rows: every change stamped up to this value has committed
+    current, pruned = ChangeSequence.objects.filter(user=user).values_list(
+        'value', 'pruned_value'
+    ).first() or (0, 0)
+
+    since = day = None
+    if token:
+        since, day = decode_sync_token(token)
+        if since is not None and not pruned <= since <= current:
+            # Tombstones after the token have been pruned (or the token wasn't
+            # issued for this data): the client has to start over
+            since = day = None
+    reset = since is None
+
+    projects = Project.objects.filter(user=user)
+    tasks = Task.objects.filter(user=user)
+    orders = TaskOrder.objects.filter(user=user)
+    deletions = DeletionLog.objects.none()
+
+    if not reset:
+        changed = Q(change_seq__gt=since, change_seq__lte=current)
+        projects = projects.filter(changed)
+        changed_tasks = changed
+        if day != today_start.date():
+            # Pending tasks suggested before today now roll over to a new day
+            changed_tasks |= Q(is_done=False, suggested_todo_datetime__lt=today_start)
+        tasks = tasks.filter(changed_tasks)
+        orders = orders.filter(changed)
+        deletions = DeletionLog.objects.filter(changed, user=user)
+
+    deleted = {'projects': [], 'tasks': [], 'task_orders': []}
+    keys = {'project': 'projects', 'task': 'tasks', 'task_order': 'task_orders'}
+    for model, object_id in deletions.order_by('change_seq', 'id').values_list('model', 'object_id'):
+        deleted[keys[model]].append(object_id)
+
+    task_rows = TaskReadSerializer.rows(
+        tasks.with_effective_suggested_todo_datetime(now).order_by('change_seq', 'id')
+    )
+    order_rows = TaskOrderReadSerializer.rows(orders.order_by('change_seq', 'id'))
+    return {
+        'token': encode_sync_token(current, today_start.date()),
+        'reset': reset,
+        'projects': ProjectSerializer(projects.order_by('change_seq', 'id'), many=True).data,
+        'tasks': TaskReadSerializer(task_rows, many=True).data,
+        'task_orders': TaskOrderReadSerializer(order_rows, many=True).data,
+        'deleted': deleted,
+    }
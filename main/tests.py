@@ -1,3 +1,444 @@
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+import base64
+import json
 
-# Create your tests here.
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from account.models import User
+from .models import ChangeSequence, DeletionLog, Project, Task, TaskDay, TaskOrder, POSITION_GAP
+from .pagination import KeysetPagination, CUSTOM_ORDER_KEYSET
+from .search import FTS_TABLE, fts_available, search_tasks
+from .serializers import TaskReadSerializer, TaskSerializer
+from .views import apply_custom_ordering
+
+
+def index_name(model, fields, partial=False):
+    """Name of the model's index on `fields` (the partial one when `partial`)"""
+    for index in model._meta.indexes:
+        if list(index.fields) == fields and (index.condition is not None) == partial:
+            return index.name
+    raise LookupError(f'No index on {fields}')
+
+
+class TaskQueryPlanTests(TestCase):
+    """The agenda and deadline queries are answered from their indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='plans@example.com', password='password')
+        project = Project.objects.get(user=cls.user, is_default=True)  # created with the user
+        now = timezone.now()
+        for i in range(30):
+            Task.objects.create(
+                title=f'Task {i}',
+                project=project,
+                user=cls.user,
+                is_done=i % 3 == 0,
+                deadline=now + timedelta(days=i % 10),
+                suggested_todo_datetime=now - timedelta(days=i % 4),
+            )
+
+    def plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            # The test tables are tiny, a sequential scan would always win
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, name):
+        plan = self.plan(queryset)
+        self.assertIn(name, plan, f'{name} not used:\n{plan}')
+
+    def test_today_uses_agenda_and_pending_suggested_indexes(self):
+        tasks = Task.objects.filter(user=self.user).on_day(self.user, timezone.now().date())
+        self.assertUsesIndex(tasks, index_name(TaskDay, ['user', 'day']))
+        self.assertUsesIndex(tasks, 'main_task_pending_suggest_idx')
+
+    def test_by_date_uses_agenda_index(self):
+        day = timezone.now().date() + timedelta(days=2)
+        tasks = Task.objects.filter(user=self.user).on_day(self.user, day, include_created=True)
+        self.assertUsesIndex(tasks, index_name(TaskDay, ['user', 'day']))
+
+    def test_upcoming_deadlines_uses_pending_deadline_index(self):
+        now = timezone.now()
+        tasks = Task.objects.filter(
+            user=self.user, is_done=False, deadline__gte=now, deadline__lte=now + timedelta(days=7)
+        ).order_by('deadline', 'id')
+        self.assertUsesIndex(tasks, 'main_task_pending_deadline_idx')
+
+
+class BatchDeleteTests(TestCase):
+    """Batch deletes are set-based like creates and updates"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='batch@example.com', password='password')
+        self.project = Project.objects.get(user=self.user, is_default=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def delete_batch(self, size):
+        tasks = [
+            Task.objects.create(title=f'Task {i}', project=self.project, user=self.user, is_done=i % 2 == 0)
+            for i in range(size)
+        ]
+        TaskOrder.objects.create(user=self.user, context='all_tasks', reference='', task=tasks[0], position=0)
+        operations = [{'op': 'delete', 'id': str(task.pk)} for task in tasks]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/main/api/tasks/batch/', {'operations': operations}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        self.assertEqual(self.delete_batch(40), self.delete_batch(5))
+
+    def test_counters_and_tombstones(self):
+        self.delete_batch(5)
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual((project.task_count, project.pending_count, project.completed_count), (0, 0, 0))
+        self.assertEqual(DeletionLog.objects.filter(user=self.user, model='task').count(), 5)
+        self.assertEqual(DeletionLog.objects.filter(user=self.user, model='task_order').count(), 1)
+
+
+class ProjectCounterTests(TestCase):
+    """Project counters follow task creates, updates, moves and deletes"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='counters@example.com', password='password')
+        self.project = Project.objects.get(user=self.user, is_default=True)
+        self.other = Project.objects.create(name='Other', user=self.user)
+        self.yesterday = timezone.now() - timedelta(days=1)
+
+    def assertCounts(self, project, task_count, pending, completed, overdue):
+        project = Project.objects.get(pk=project.pk)
+        self.assertEqual(
+            (project.task_count, project.pending_count, project.completed_count, project.overdue_count),
+            (task_count, pending, completed, overdue)
+        )
+
+    def create(self, **fields):
+        return Task.objects.create(title='Task', project=self.project, user=self.user, **fields)
+
+    def test_create(self):
+        self.create()
+        self.create(deadline=self.yesterday)
+        self.create(is_done=True, deadline=self.yesterday)
+        self.assertCounts(self.project, 3, 2, 1, 1)
+
+    def test_update(self):
+        task = self.create(deadline=self.yesterday)
+        task.is_done = True
+        task.save()
+        self.assertCounts(self.project, 1, 0, 1, 0)
+        task.is_done = False
+        task.deadline = None
+        task.save()
+        self.assertCounts(self.project, 1, 1, 0, 0)
+
+    def test_move_to_another_project(self):
+        task = self.create(deadline=self.yesterday)
+        task.project = self.other
+        task.save()
+        self.assertCounts(self.project, 0, 0, 0, 0)
+        self.assertCounts(self.other, 1, 1, 0, 1)
+
+    def test_delete(self):
+        self.create()
+        self.create(is_done=True).delete()
+        self.assertCounts(self.project, 1, 1, 0, 0)
+        Task.objects.filter(user=self.user).delete()
+        self.assertCounts(self.project, 0, 0, 0, 0)
+
+    def test_delete_of_an_outdated_instance(self):
+        task = self.create()
+        stale = Task.objects.get(pk=task.pk)
+        task.is_done = True
+        task.save()
+        # The counters follow the stored task, not the state `stale` was loaded with
+        stale.delete()
+        self.assertCounts(self.project, 0, 0, 0, 0)
+
+    def test_project_delete_leaves_other_projects_alone(self):
+        self.create()
+        Task.objects.create(title='Task', project=self.other, user=self.user)
+        self.other.delete()
+        self.assertCounts(self.project, 1, 1, 0, 0)
+
+
+class SearchIndexTests(TestCase):
+    """The SQLite search triggers survive migrations that remake main_task"""
+
+    TRIGGERS = {f'{FTS_TABLE}_insert', f'{FTS_TABLE}_update', f'{FTS_TABLE}_delete'}
+
+    def setUp(self):
+        if connection.vendor != 'sqlite' or not fts_available(connection):
+            self.skipTest('No SQLite FTS5 search index')
+        self.user = User.objects.create_user(email='search@example.com', password='password')
+        self.project = Project.objects.get(user=self.user, is_default=True)
+
+    def triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'main_task'")
+            return {name for name, in cursor.fetchall()}
+
+    def matches(self, query):
+        return list(search_tasks(Task.objects.filter(user=self.user), self.user, query).values_list('title', flat=True))
+
+    def test_triggers_exist_after_migrate(self):
+        self.assertLessEqual(self.TRIGGERS, self.triggers())
+
+    def test_post_migrate_restores_dropped_triggers(self):
+        Task.objects.create(title='Call the plumber', project=self.project, user=self.user)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {FTS_TABLE}_update')
+            cursor.execute(f'DROP TRIGGER {FTS_TABLE}_insert')
+        Task.objects.create(title='Pay the plumber', project=self.project, user=self.user)
+
+        emit_post_migrate_signal(verbosity=0, interactive=False, db=connection.alias)
+
+        self.assertLessEqual(self.TRIGGERS, self.triggers())
+        self.assertCountEqual(self.matches('plumber'), ['Call the plumber', 'Pay the plumber'])
+        Task.objects.create(title='Thank the plumber', project=self.project, user=self.user)
+        self.assertEqual(len(self.matches('plumber')), 3)
+
+
+class SyncTokenTests(TestCase):
+    """Sync tokens are positions in the user's change sequence"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='sync@example.com', password='password')
+        self.project = Project.objects.get(user=self.user, is_default=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, token=None):
+        response = self.client.get('/main/api/sync/', {'since': token} if token else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def create(self, title='Task', **fields):
+        return Task.objects.create(title=title, project=self.project, user=self.user, **fields)
+
+    def test_changes_since_the_token(self):
+        kept = self.create('Kept')
+        removed = self.create('Removed')
+        first = self.sync()
+        self.assertTrue(first['reset'])
+
+        kept.title = 'Renamed'
+        kept.save()
+        removed_id = str(removed.pk)
+        removed.delete()
+        changes = self.sync(first['token'])
+        self.assertFalse(changes['reset'])
+        self.assertEqual([task['title'] for task in changes['tasks']], ['Renamed'])
+        self.assertEqual(changes['deleted']['tasks'], [removed_id])
+        # The counters moved, which stamps the project too
+        self.assertEqual([project['task_count'] for project in changes['projects']], [1])
+
+        # Nothing is sent twice
+        again = self.sync(changes['token'])
+        self.assertEqual((again['tasks'], again['projects'], again['deleted']['tasks']), ([], [], []))
+
+    def test_every_write_takes_a_higher_value(self):
+        task = self.create()
+        created = Task.objects.get(pk=task.pk).change_seq
+        task.save()
+        self.assertGreater(Task.objects.get(pk=task.pk).change_seq, created)
+        self.assertEqual(
+            ChangeSequence.objects.get(user=self.user).value,
+            Task.objects.get(pk=task.pk).change_seq
+        )
+
+    def test_rollover_command_stamps_tasks(self):
+        task = self.create(suggested_todo_datetime=timezone.now() - timedelta(days=2))
+        token = self.sync()['token']
+        call_command('rollover_suggested_dates', stdout=StringIO())
+        self.assertEqual([row['id'] for row in self.sync(token)['tasks']], [str(task.pk)])
+
+    def test_pruned_tombstones_reset_the_token(self):
+        task = self.create()
+        token = self.sync()['token']
+        task.delete()
+        call_command('prune_deletion_log', days=-1, stdout=StringIO())
+        self.assertTrue(self.sync(token)['reset'])
+
+    def test_time_based_tokens_reset(self):
+        payload = json.dumps({'since': timezone.now().isoformat(), 'day': timezone.now().date().isoformat()})
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        self.assertTrue(self.sync(token)['reset'])
+
+    def test_invalid_tokens(self):
+        negative = base64.urlsafe_b64encode(b'{"seq":-1,"day":"2024-01-01"}').decode()
+        for token in ('garbage', negative):
+            response = self.client.get('/main/api/sync/', {'since': token})
+            self.assertEqual(response.status_code, 400)
+
+
+class MoveTaskTests(TestCase):
+    """Moves write the moved task's rank, ranking unordered tasks only as far as needed"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='move@example.com', password='password')
+        project = Project.objects.get(user=self.user, is_default=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        # Shown most recent first: Task 0, Task 1, ...
+        self.tasks = []
+        for i in range(20):
+            task = Task.objects.create(title=f'Task {i}', project=project, user=self.user)
+            Task.objects.filter(pk=task.pk).update(created_at=now - timedelta(minutes=i))
+            self.tasks.append(task)
+
+    def move(self, task, after=None, before=None):
+        data = {'context': 'all_tasks'}
+        if after:
+            data['after_id'] = str(after.pk)
+        if before:
+            data['before_id'] = str(before.pk)
+        response = self.client.post(f'/main/api/tasks/{task.pk}/move/', data, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response
+
+    def shown(self):
+        tasks = apply_custom_ordering(Task.objects.filter(user=self.user), self.user, 'all_tasks')
+        return [int(title.split()[1]) for title in tasks.values_list('title', flat=True)]
+
+    def ranked(self):
+        return set(TaskOrder.objects.filter(user=self.user).values_list('task__title', flat=True))
+
+    def test_first_move_ranks_only_the_tasks_shown_up_to_the_neighbours(self):
+        self.move(self.tasks[15], after=self.tasks[2], before=self.tasks[3])
+        self.assertEqual(self.ranked(), {'Task 0', 'Task 1', 'Task 2', 'Task 3', 'Task 15'})
+        self.assertEqual(self.shown(), [0, 1, 2, 15, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 18, 19])
+
+    def test_move_to_the_top_writes_one_row(self):
+        self.move(self.tasks[5], before=self.tasks[0])
+        self.assertEqual(self.ranked(), {'Task 0', 'Task 5'})
+        with CaptureQueriesContext(connection) as queries:
+            self.move(self.tasks[9], after=self.tasks[5], before=self.tasks[0])
+        order_writes = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(('INSERT', 'UPDATE')) and 'main_taskorder' in query['sql']
+        ]
+        self.assertEqual(len(order_writes), 1)
+        self.assertEqual(self.shown()[:4], [5, 9, 0, 1])
+
+    def test_position_between_neighbours(self):
+        self.move(self.tasks[4], after=self.tasks[0], before=self.tasks[1])
+        positions = dict(TaskOrder.objects.filter(user=self.user).values_list('task__title', 'position'))
+        self.assertEqual(positions['Task 4'], (positions['Task 0'] + positions['Task 1']) // 2)
+
+    def test_rebalance_when_the_gap_is_exhausted(self):
+        self.move(self.tasks[1], after=self.tasks[0])
+        # Halving the gap between Task 0 and the task after it runs out after ~log2(GAP) moves
+        for i in range(2, 15):
+            first, second = self.shown()[:2]
+            self.move(self.tasks[i], after=self.tasks[first], before=self.tasks[second])
+        shown = self.shown()
+        self.assertEqual(shown[:2], [0, 14])
+        self.assertEqual(sorted(shown), list(range(20)))
+        positions = list(TaskOrder.objects.filter(user=self.user).order_by('position').values_list('position', flat=True))
+        self.assertEqual(len(set(positions)), len(positions))
+        self.assertTrue(any(position % POSITION_GAP == 0 for position in positions))
+
+    def test_neighbours_must_be_adjacent(self):
+        response = self.client.post(f'/main/api/tasks/{self.tasks[9].pk}/move/', {
+            'context': 'all_tasks', 'after_id': str(self.tasks[0].pk), 'before_id': str(self.tasks[2].pk)
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages walk the custom order, NULL positions included, without gaps or repeats"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='keyset@example.com', password='password')
+        project = Project.objects.get(user=self.user, is_default=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        tasks = [Task.objects.create(title=f'Task {i}', project=project, user=self.user) for i in range(12)]
+        # Ties on created_at are broken by id
+        for i, task in enumerate(tasks):
+            Task.objects.filter(pk=task.pk).update(created_at=now - timedelta(minutes=i // 3))
+        # A few ranked tasks come first, the rest (NULL position) follow
+        for position, task in enumerate(tasks[8:], start=1):
+            TaskOrder.objects.create(user=self.user, context='all_tasks', reference='', task=task, position=position)
+
+    def full_list(self):
+        return [task['id'] for task in self.client.get('/main/api/tasks/').json()]
+
+    def test_pages_match_the_full_list(self):
+        ids, url = [], '/main/api/tasks/?page_size=5'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [task['id'] for task in response.json()['results']]
+            url = response.json()['next']
+        self.assertEqual(ids, self.full_list())
+        self.assertEqual(len(ids), 12)
+
+    def test_cursor_on_a_null_position(self):
+        tasks = apply_custom_ordering(Task.objects.filter(user=self.user), self.user, 'all_tasks')
+        rows = list(tasks.values_list('custom_position', 'created_at', 'id'))
+        self.assertIsNone(rows[6][0])
+        after = tasks.filter(KeysetPagination(CUSTOM_ORDER_KEYSET).keyset_filter(list(rows[6])))
+        self.assertEqual(list(after.values_list('id', flat=True)), [pk for _, _, pk in rows[7:]])
+
+    def test_cursor_after_the_last_row(self):
+        tasks = apply_custom_ordering(Task.objects.filter(user=self.user), self.user, 'all_tasks')
+        last = list(tasks.values_list('custom_position', 'created_at', 'id'))[-1]
+        self.assertFalse(tasks.filter(KeysetPagination(CUSTOM_ORDER_KEYSET).keyset_filter(list(last))).exists())
+
+    def test_invalid_cursor(self):
+        for cursor in ('garbage', KeysetPagination.encode_cursor([1, 2])):
+            response = self.client.get('/main/api/tasks/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404)
+
+
+class TaskReadSerializerTests(TestCase):
+    """TaskReadSerializer renders task lists byte for byte like TaskSerializer"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='serializers@example.com', password='password')
+        project = Project.objects.get(user=self.user, is_default=True)
+        other = Project.objects.create(name='Other', color_code='#10B981', user=self.user)
+        now = timezone.now()
+        Task.objects.create(title='Plain', project=project, user=self.user)
+        Task.objects.create(
+            title='Everything', description='With a description', priority='high', project=other,
+            user=self.user, deadline=now + timedelta(days=2, microseconds=7),
+            suggested_todo_datetime=now + timedelta(hours=3),
+        )
+        Task.objects.create(title='Done', priority='low', is_done=True, project=project, user=self.user)
+        # Rolled over to today by with_effective_suggested_todo_datetime()
+        Task.objects.create(
+            title='Overdue', project=other, user=self.user,
+            suggested_todo_datetime=now - timedelta(days=3, hours=5),
+        )
+
+    def render_both(self):
+        tasks = Task.objects.filter(user=self.user).with_effective_suggested_todo_datetime().order_by('created_at', 'id')
+        expected = JSONRenderer().render(TaskSerializer(tasks.select_related('project'), many=True).data)
+        actual = JSONRenderer().render(TaskReadSerializer(TaskReadSerializer.rows(tasks), many=True).data)
+        return expected, actual
+
+    def test_same_output(self):
+        expected, actual = self.render_both()
+        self.assertEqual(actual, expected)
+        self.assertIn(b'"Overdue"', actual)
+
+    def test_same_output_in_another_timezone(self):
+        with timezone.override('America/New_York'):
+            expected, actual = self.render_both()
+        self.assertEqual(actual, expected)
+        self.assertRegex(actual.decode(), r'-0[45]:00"')
@@ -7,5 +7,8 @@ router.register(r'projects', views.ProjectViewSet)
 router.register(r'tasks', views.TaskViewSet)
 
 urlpatterns = [
+    path('api/export/', views.export_data, name='export'),
+    path('api/sync/', views.sync, name='sync'),
+    path('api/autocomplete/', views.autocomplete, name='autocomplete'),
     path('api/', include(router.urls)),
 ]
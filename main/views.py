@@ -1,45 +1,36 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, renderer_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Case, When
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.db import transaction
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.db.models import prefetch_related_objects, Q, F, OuterRef, Subquery, Prefetch, Max, Min, Case, When, Value, CharField, IntegerField, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 from datetime import datetime, timedelta
 import uuid
-from .models import Project, Task, TaskOrder
+from .models import Project, Task, TaskOrder, TaskDay, ChangeSequence, DeletionLog, POSITION_GAP, PRIORITY_CHOICES, start_of_today
+from .renderers import JSONStream, streaming_json_response, NDJSONRenderer, CSVRenderer
+from .export import export_stream
+from .sync import collect_changes
+from .stats import task_stats, STATS_SECTIONS
+from .search import search_tasks
+from .autocomplete import autocomplete as autocomplete_matches, AUTOCOMPLETE_KINDS
+from .cache import collection_etag, cache_user_response, bump_data_version_on_commit
+from .pagination import KeysetPagination, CUSTOM_ORDER_KEYSET, CREATED_AT_KEYSET, DEADLINE_KEYSET, SEARCH_KEYSET
 from .serializers import (
-    ProjectSerializer, TaskSerializer, TaskCreateSerializer, 
+    ProjectSerializer, TaskSerializer, TaskReadSerializer, TaskCreateSerializer, 
     TaskUpdateSerializer, ProjectTaskSerializer, TaskOrderSerializer,
-    ReorderTasksSerializer
+    ReorderTasksSerializer, MoveTaskSerializer, BatchTasksSerializer,
+    BatchOperationSerializer, BatchTaskDataSerializer
 )
 
 
-def update_expired_suggested_todo_datetime(tasks):
-    """Update suggested_todo_datetime to today for tasks where it has passed"""
-    today = timezone.now().date()
-    tasks_to_update = []
-    
-    for task in tasks:
-        if (task.suggested_todo_datetime and 
-            task.suggested_todo_datetime.date() < today and 
-            not task.is_done):
-            task.suggested_todo_datetime = timezone.now().replace(
-                hour=task.suggested_todo_datetime.hour,
-                minute=task.suggested_todo_datetime.minute,
-                second=0,
-                microsecond=0
-            )
-            tasks_to_update.append(task)
-    
-    # Bulk update tasks with new suggested_todo_datetime
-    if tasks_to_update:
-        Task.objects.bulk_update(
-            tasks_to_update, 
-            ['suggested_todo_datetime'], 
-            batch_size=100
-        )
-    
-    return tasks
+# Longest range served by the calendar endpoint (a six-week month grid fits)
+CALENDAR_MAX_DAYS = 62
 
 
 def apply_custom_ordering(tasks, user, context, reference=None):
@@ -62,84 +53,482 @@ def apply_custom_ordering(tasks, user, context, reference=None):
     # Normalize reference to empty string if None
     reference = reference or ''
     
-    # Check if custom ordering exists for this context
-    order_qs = TaskOrder.objects.filter(
+    # Position of each task in the user's custom order for this context (NULL when unordered).
+    # Resolved by the database in the same query, so the cost does not grow with the number of
+    # ordered tasks.
+    position = TaskOrder.objects.filter(
         user=user,
         context=context,
-        reference=reference
-    ).select_related('task')
+        reference=reference,
+        task=OuterRef('pk')
+    ).order_by().values('position')[:1]
     
-    # NO CUSTOM ORDER: Return tasks in default order (most recent first)
-    if not order_qs.exists():
-        return tasks.order_by('-created_at')
+    # Tasks with custom order come first (sorted by position: 0, 1, 2, ...)
+    # Tasks without custom order come last (sorted by created_at desc)
+    # Without any custom order this is simply the default order (most recent first)
+    return tasks.annotate(custom_position=Subquery(position)).order_by(
+        F('custom_position').asc(nulls_last=True),
+        '-created_at',
+        'id'
+    )
+
+
+def apply_project_ordering(tasks, user, projects, tasks_per_project=None, grouped=False):
+    """
+    Order tasks of several projects by each project's custom 'by_project' order
+    (same rules as apply_custom_ordering), optionally keeping only the first
+    `tasks_per_project` tasks of every project. With `grouped`, tasks are also
+    sorted by project, following the order of `projects`.
+
+    The reference of a project's order is its id as a string; it is mapped in
+    SQL so every project is resolved by the same query.
+    """
+    if not projects:
+        return tasks.none()
     
-    # CUSTOM ORDER EXISTS: Apply user's custom ordering
-    # Create a mapping of task_id to position
-    order_map = {str(order.task.id): order.position for order in order_qs}
+    reference = Case(
+        *[When(project_id=project.pk, then=Value(str(project.pk))) for project in projects],
+        default=Value(''),
+        output_field=CharField()
+    )
+    position = TaskOrder.objects.filter(
+        user=user,
+        context='by_project',
+        reference=OuterRef('order_reference'),
+        task=OuterRef('pk')
+    ).order_by().values('position')[:1]
     
-    # Get task IDs that are in the current queryset
-    task_ids = [str(task.id) for task in tasks]
+    ordering = [F('custom_position').asc(nulls_last=True), F('created_at').desc(), F('id').asc()]
+    tasks = tasks.annotate(order_reference=reference).annotate(custom_position=Subquery(position))
+    if tasks_per_project:
+        # Number the tasks inside each project and keep the first N
+        tasks = tasks.annotate(
+            project_row=Window(RowNumber(), partition_by=[F('project_id')], order_by=ordering)
+        ).filter(project_row__lte=tasks_per_project)
+    if grouped:
+        project_index = Case(
+            *[When(project_id=project.pk, then=Value(index)) for index, project in enumerate(projects)],
+            output_field=IntegerField()
+        )
+        ordering = [project_index.asc(), *ordering]
+    return tasks.order_by(*ordering)
+
+
+def group_calendar_tasks(tasks, user, start, end, now=None):
+    """
+    Serialize the tasks of Task.on_days() into a {date: [task, ...]} map covering
+    every day from `start` to `end`. Each day lists what `by_date` would list, in
+    that day's custom 'by_date' order (same rules as apply_custom_ordering); the
+    orders of all days are read with one query.
+    """
+    today = start_of_today(now).date()
+    days = {}
+    day = start
+    while day <= end:
+        days[day] = []
+        day += timedelta(days=1)
     
-    # Filter order_map to only include tasks in the current queryset
-    relevant_order_map = {tid: pos for tid, pos in order_map.items() if tid in task_ids}
+    positions = {
+        (reference, task_id): position
+        for reference, task_id, position in TaskOrder.objects.filter(
+            user=user,
+            context='by_date',
+            reference__in=[day.isoformat() for day in days]
+        ).values_list('reference', 'task_id', 'position')
+    }
     
-    # If there are no relevant orders (all ordered tasks were deleted), return default order
-    if not relevant_order_map:
-        return tasks.order_by('-created_at')
+    serializer = TaskReadSerializer()
+    seen = set()
+    for row in TaskReadSerializer.rows(tasks.order_by('-created_at', 'id')):
+        day = row['agenda_day']
+        on_days = []
+        if day in days and (
+            row['via_deadline'] or row['via_created']
+            or (row['via_suggested'] and (day >= today or row['is_done']))
+        ):
+            on_days.append(day)
+        if row['via_suggested'] and not row['is_done'] and day < today and today in days:
+            # Rolled over onto today
+            on_days.append(today)
+        for day in on_days:
+            if (day, row['id']) in seen:
+                continue
+            seen.add((day, row['id']))
+            days[day].append((positions.get((day.isoformat(), row['id'])), serializer.to_representation(row)))
     
-    # Create Case/When for database-level ordering
-    # Tasks with custom order come first (sorted by position: 0, 1, 2, ...)
-    # Tasks without custom order come last (sorted by created_at desc)
-    preserved_order = Case(
-        *[When(id=uuid.UUID(tid), then=pos) for tid, pos in relevant_order_map.items()],
-        default=999999  # High number to push unordered tasks to the end
+    # Rows come most recent first; the stable sort puts the custom order in front
+    return {
+        day.isoformat(): [
+            data for _, data in sorted(entries, key=lambda entry: (entry[0] is None, entry[0] or 0))
+        ]
+        for day, entries in days.items()
+    }
+
+
+def wants_stream(request):
+    """True when the client asked for a streamed response (`stream=true`)"""
+    return request.query_params.get('stream', '').lower() in ['true', '1']
+
+
+def stream_tasks(rows):
+    """JSON array of task rows (TaskReadSerializer.rows) fetched in chunks"""
+    serializer = TaskReadSerializer()
+    return JSONStream(
+        serializer.to_representation(row)
+        for row in rows.iterator(chunk_size=settings.STREAM_CHUNK_SIZE)
     )
-    
-    # Apply ordering: custom position first, then creation date for ties
-    ordered_tasks = tasks.order_by(preserved_order, '-created_at')
-    
-    return ordered_tasks
 
 
 def create_or_update_task_order(user, context, reference, task_ids):
     """
     Create or update task order for a given context.
     task_ids should be a list of task IDs in the desired order.
+    
+    Ownership of all ids is checked with one query and only rows whose position
+    changed are written, in a single transaction.
     """
     reference = reference or ''
     
-    # Delete existing orders for this context
-    TaskOrder.objects.filter(
-        user=user,
-        context=context,
-        reference=reference
-    ).delete()
-    
-    # Create new orders
-    orders_to_create = []
+    # Desired position of each valid task id (the first occurrence wins)
+    requested = {}
     for position, task_id in enumerate(task_ids):
         try:
             task_uuid = uuid.UUID(task_id)
-            # Verify task belongs to user
-            task = Task.objects.get(id=task_uuid, user=user)
-            orders_to_create.append(
-                TaskOrder(
-                    user=user,
-                    context=context,
-                    reference=reference,
-                    task=task,
-                    position=position
-                )
+        except (ValueError, TypeError, AttributeError):
+            # Skip invalid task IDs
+            continue
+        requested.setdefault(task_uuid, position * POSITION_GAP)
+    
+    with transaction.atomic():
+        change_seq = ChangeSequence.next_value(user.pk)
+        # Lock the current order so concurrent reorders of this context can't interleave
+        orders = TaskOrder.objects.filter(user=user, context=context, reference=reference)
+        existing = dict(orders.select_for_update().values_list('task_id', 'position'))
+        
+        # Skip tasks not belonging to user
+        owned = set(
+            Task.objects.filter(user=user, id__in=list(requested)).values_list('id', flat=True)
+        )
+        wanted = {task_id: position for task_id, position in requested.items() if task_id in owned}
+        
+        # Remove tasks that are no longer part of the order
+        removed = [task_id for task_id in existing if task_id not in wanted]
+        if removed:
+            stale = orders.filter(task_id__in=removed)
+            DeletionLog.objects.bulk_create([
+                DeletionLog(user=user, model='task_order', object_id=str(pk), change_seq=change_seq)
+                for pk in stale.order_by().values_list('pk', flat=True)
+            ])
+            stale._deletions_recorded = True
+            stale.delete()
+        
+        # Upsert only the rows whose position changed
+        changed = [
+            TaskOrder(user=user, context=context, reference=reference, task_id=task_id, position=position,
+                      change_seq=change_seq)
+            for task_id, position in wanted.items()
+            if existing.get(task_id) != position
+        ]
+        if changed:
+            TaskOrder.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=['user', 'context', 'reference', 'task'],
+                update_fields=['position', 'updated_at', 'change_seq']
+            )
+        # bulk_create doesn't send post_save
+        bump_data_version_on_commit(user.pk)
+    
+    return len(wanted)
+
+
+def validate_order_reference(user, context, reference):
+    """
+    Validate the reference of an ordering context.
+    Returns an error Response, or None when the reference is valid.
+    """
+    if context == 'by_project':
+        if not reference:
+            return Response(
+                {'error': 'reference (project_id) is required for by_project context'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            # Verify project exists and belongs to user
+            project_uuid = uuid.UUID(reference)
+            Project.objects.get(id=project_uuid, user=user)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid UUID format for project_id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Project.DoesNotExist:
+            return Response(
+                {'error': 'Project not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+    
+    elif context == 'by_date':
+        if not reference:
+            return Response(
+                {'error': 'reference (date) is required for by_date context'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        except (ValueError, TypeError, Task.DoesNotExist):
-            # Skip invalid task IDs or tasks not belonging to user
+        try:
+            datetime.strptime(reference, '%Y-%m-%d')
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    return None
+
+
+def get_context_tasks(user, context, reference=None):
+    """Return the user's tasks that are listed in an ordering context"""
+    tasks = Task.objects.filter(user=user).with_effective_suggested_todo_datetime()
+    if context == 'today':
+        return tasks.on_day(user, timezone.now().date())
+    if context == 'by_date':
+        return tasks.on_day(user, datetime.strptime(reference, '%Y-%m-%d').date(), include_created=True)
+    if context == 'by_project':
+        return tasks.filter(project_id=reference)
+    return tasks
+
+
+def rank_unordered_tasks(user, context, reference, task_ids, change_seq):
+    """
+    Give positions after the existing ones to the unordered tasks of the context
+    shown up to the last of `task_ids`, in the order they are currently displayed
+    (most recent first). Tasks shown after it keep the created_at fallback: they
+    still come after every ranked task, so the visible order doesn't change.
+    """
+    orders = TaskOrder.objects.filter(user=user, context=context, reference=reference)
+    unordered = get_context_tasks(user, context, reference).exclude(pk__in=orders.values('task_id'))
+    last = unordered.filter(pk__in=task_ids).order_by('created_at', '-id').values_list('created_at', 'pk').first()
+    if last is None:
+        return
+    created_at, pk = last
+    shown_before = unordered.filter(
+        Q(created_at__gt=created_at) | Q(created_at=created_at, pk__lte=pk)
+    ).order_by('-created_at', 'id').values_list('pk', flat=True)
+    
+    last_position = orders.aggregate(last=Max('position'))['last']
+    start = POSITION_GAP if last_position is None else last_position + POSITION_GAP
+    TaskOrder.objects.bulk_create([
+        TaskOrder(user=user, context=context, reference=reference, task_id=task_id,
+                  position=start + index * POSITION_GAP, change_seq=change_seq)
+        for index, task_id in enumerate(shown_before)
+    ])
+
+
+def rebalance_task_order(user, context, reference, change_seq):
+    """Spread the positions of a context evenly, restoring the gaps between neighbours"""
+    orders = list(
+        TaskOrder.objects.filter(user=user, context=context, reference=reference)
+        .select_for_update()
+        .order_by('position', '-task__created_at')
+    )
+    now = timezone.now()
+    for index, order in enumerate(orders):
+        order.position = (index + 1) * POSITION_GAP
+        order.updated_at = now
+        order.change_seq = change_seq
+    TaskOrder.objects.bulk_update(orders, ['position', 'updated_at', 'change_seq'], batch_size=500)
+
+
+def move_task_order(user, context, reference, task, before_id=None, after_id=None):
+    """
+    Move a single task between two neighbours of a context's custom order.
+    
+    `after_id` is the task that should precede the moved task and `before_id` the one
+    that should follow it; either may be omitted to move the task to the start or
+    end of the neighbourhood. Only the moved task's TaskOrder row is written, unless
+    the neighbours have no rank yet (the tasks shown up to them are ranked first, see
+    rank_unordered_tasks) or the context has no room left between the neighbours and
+    must be rebalanced first.
+    
+    Returns the new position. Raises ValueError when a neighbour is the moved task
+    itself, or when both are given but aren't adjacent in the current order.
+    """
+    reference = reference or ''
+    neighbour_ids = [tid for tid in (before_id, after_id) if tid]
+    if task.pk in neighbour_ids:
+        raise ValueError('A task cannot be its own neighbour')
+    orders = TaskOrder.objects.filter(user=user, context=context, reference=reference)
+    
+    with transaction.atomic():
+        change_seq = ChangeSequence.next_value(user.pk)
+        ranks = dict(orders.select_for_update().filter(task_id__in=neighbour_ids).values_list('task_id', 'position'))
+        if len(ranks) < len(neighbour_ids):
+            # The neighbours are only shown in the default order so far: rank them and
+            # the unordered tasks shown before them, matching what the user currently sees
+            if Task.objects.filter(user=user, pk__in=neighbour_ids).count() < len(neighbour_ids):
+                raise Task.DoesNotExist('Neighbour task not found')
+            rank_unordered_tasks(user, context, reference, neighbour_ids, change_seq)
+            ranks = dict(orders.filter(task_id__in=neighbour_ids).values_list('task_id', 'position'))
+            if len(ranks) < len(neighbour_ids):
+                raise ValueError('Neighbour task is not part of this context')
+        
+        others = orders.exclude(task=task)
+        for attempt in range(2):
+            lower = ranks.get(after_id) if after_id else None
+            upper = ranks.get(before_id) if before_id else None
+            if lower is None and upper is not None and not after_id:
+                lower = others.filter(position__lt=upper).aggregate(p=Max('position'))['p']
+            if upper is None and lower is not None and not before_id:
+                upper = others.filter(position__gt=lower).aggregate(p=Min('position'))['p']
+            
+            if lower is not None and upper is not None and lower >= upper:
+                raise ValueError('after_id must come before before_id')
+            if after_id and before_id and others.filter(position__gt=lower, position__lt=upper).exists():
+                raise ValueError('after_id and before_id must be adjacent')
+            
+            if lower is None:
+                position = upper - POSITION_GAP
+            elif upper is None:
+                position = lower + POSITION_GAP
+            else:
+                position = (lower + upper) // 2
+            
+            if position not in (lower, upper) and abs(position) < 2 ** 30:
+                break
+            
+            # Gap exhausted (or positions drifting out of range): respace and retry
+            rebalance_task_order(user, context, reference, change_seq)
+            ranks = dict(orders.filter(task_id__in=neighbour_ids).values_list('task_id', 'position'))
+        
+        # One upsert, stamped with the value taken above (save() would take another)
+        TaskOrder.objects.bulk_create(
+            [TaskOrder(user=user, context=context, reference=reference, task=task,
+                       position=position, change_seq=change_seq)],
+            update_conflicts=True,
+            unique_fields=['user', 'context', 'reference', 'task'],
+            update_fields=['position', 'updated_at', 'change_seq']
+        )
+        # bulk_create doesn't send post_save
+        bump_data_version_on_commit(user.pk)
+    
+    return position
+
+
+def parse_batch_operations(user, operations):
+    """
+    Validate batch operations with set-based ownership checks.
+    Returns (parsed operations, projects by id, existing tasks by id, errors by index).
+    """
+    parsed = []
+    errors = {}
+    seen_ids = set()
+    for index, operation in enumerate(operations):
+        serializer = BatchOperationSerializer(data=operation)
+        if not serializer.is_valid():
+            errors[index] = serializer.errors
+            parsed.append(None)
             continue
+        op = serializer.validated_data
+        data_serializer = BatchTaskDataSerializer(data=op.get('data') or {}, partial=op['op'] == 'update')
+        if op['op'] != 'delete' and not data_serializer.is_valid():
+            errors[index] = {'data': data_serializer.errors}
+            parsed.append(None)
+            continue
+        fields = data_serializer.validated_data if op['op'] != 'delete' else {}
+        if op['op'] == 'create' and 'project' not in fields:
+            errors[index] = {'data': {'project': ['This field is required.']}}
+        elif op.get('id') and op['id'] in seen_ids:
+            errors[index] = {'id': ['A task can only appear in one operation per batch']}
+        if op.get('id'):
+            seen_ids.add(op['id'])
+        parsed.append({'op': op['op'], 'id': op.get('id'), 'fields': fields})
+    
+    valid = [op for index, op in enumerate(parsed) if op and index not in errors]
+    project_ids = {op['fields']['project'] for op in valid if 'project' in op['fields']}
+    projects = {project.pk: project for project in Project.objects.filter(user=user, id__in=project_ids).order_by()} if project_ids else {}
+    
+    task_ids = {op['id'] for op in valid if op['op'] != 'create'}
+    tasks = {
+        task.pk: task
+        for task in Task.objects.select_for_update().filter(user=user, id__in=task_ids).order_by()
+    } if task_ids else {}
     
-    # Bulk create all orders
-    if orders_to_create:
-        TaskOrder.objects.bulk_create(orders_to_create)
+    client_ids = {op['id'] for op in valid if op['op'] == 'create' and op['id']}
+    taken_ids = set(Task.objects.filter(id__in=client_ids).order_by().values_list('id', flat=True)) if client_ids else set()
+    
+    for index, op in enumerate(parsed):
+        if not op or index in errors:
+            continue
+        if 'project' in op['fields'] and op['fields']['project'] not in projects:
+            errors[index] = {'data': {'project': ['Project not found']}}
+        elif op['op'] != 'create' and op['id'] not in tasks:
+            errors[index] = {'id': ['Task not found']}
+        elif op['op'] == 'create' and op['id'] in taken_ids:
+            errors[index] = {'id': ['A task with this id already exists']}
     
-    return len(orders_to_create)
+    return parsed, projects, tasks, errors
+
+
+def apply_batch_operations(user, parsed, projects, tasks, change_seq):
+    """
+    Apply validated batch operations with one bulk statement per kind, stamping
+    the written tasks with `change_seq`.
+    Returns the ids of created, updated and deleted tasks.
+    """
+    now = timezone.now()
+    created = []
+    updated = []
+    update_fields = {'datetime_done', 'updated_at', 'change_seq'}
+    deleted_ids = []
+    count_changes = []
+    
+    for op in parsed:
+        fields = dict(op['fields'])
+        project_id = fields.pop('project', None)
+        if op['op'] == 'create':
+            task = Task(user=user, project=projects[project_id], **fields)
+            if op['id']:
+                task.id = op['id']
+            created.append(task)
+        elif op['op'] == 'update':
+            task = tasks[op['id']]
+            old_state = task.counter_state()
+            for field, value in fields.items():
+                setattr(task, field, value)
+            update_fields.update(fields)
+            if project_id:
+                task.project = projects[project_id]
+                update_fields.add('project')
+            task.updated_at = now
+            updated.append(task)
+            count_changes.append((old_state, None))
+        else:
+            deleted_ids.append(op['id'])
+    
+    # Same bookkeeping as Task.save, which bulk operations bypass
+    for task in created + updated:
+        task.change_seq = change_seq
+        if task.is_done and not task.datetime_done:
+            task.datetime_done = now
+        elif not task.is_done and task.datetime_done:
+            task.datetime_done = None
+    
+    if created:
+        Task.objects.bulk_create(created, batch_size=500)
+    if updated:
+        Task.objects.bulk_update(updated, sorted(update_fields), batch_size=500)
+    count_changes = [
+        (old_state, task.counter_state())
+        for (old_state, _), task in zip(count_changes, updated)
+    ] + [(None, task.counter_state()) for task in created]
+    Project.apply_bulk_task_count_changes(count_changes, change_seq)
+    TaskDay.sync_tasks(created + [task for task in updated if task.agenda_state() != task._agenda_state])
+    if deleted_ids:
+        # Set-based as well: counters and tombstones are written in bulk
+        Task.objects.filter(user=user, id__in=deleted_ids).delete()
+    # bulk_create/bulk_update don't send post_save
+    bump_data_version_on_commit(user.pk)
+    
+    return [task.pk for task in created], [task.pk for task in updated], deleted_ids
 
 
 class ProjectViewSet(viewsets.ModelViewSet):
@@ -166,29 +555,98 @@ class ProjectViewSet(viewsets.ModelViewSet):
         
         return user_projects
     
+    @method_decorator(condition(etag_func=collection_etag))
+    @method_decorator(cache_user_response)
+    def list(self, request, *args, **kwargs):
+        """List the user's projects (answers If-None-Match with 304 when nothing changed)"""
+        return super().list(request, *args, **kwargs)
+    
     def perform_create(self, serializer):
         """Create a project for the authenticated user"""
         serializer.save(user=self.request.user)
     
     @action(detail=True, methods=['get'])
+    @method_decorator(condition(etag_func=collection_etag))
+    @method_decorator(cache_user_response)
     def tasks(self, request, pk=None):
         """Get all tasks for a specific project"""
         project = self.get_object()
-        tasks = project.tasks.all()
+        tasks = project.tasks.with_effective_suggested_todo_datetime()
         
-        # Update expired suggested_todo_datetime for project tasks
-        tasks_list = list(tasks)
-        update_expired_suggested_todo_datetime(tasks_list)
-        
-        serializer = TaskSerializer(tasks_list, many=True)
+        serializer = TaskReadSerializer(TaskReadSerializer.rows(tasks), many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=collection_etag))
+    @method_decorator(cache_user_response)
     def with_tasks(self, request):
-        """Get all projects with their tasks, creating default project if none exist"""
-        projects = self.get_queryset()  # This will automatically create default project if needed
+        """
+        Get all projects with their tasks, creating default project if none exist.
+        
+        Tasks follow each project's custom 'by_project' order. Query parameters:
+        - tasks_per_project: Optional. Only return the first N tasks of each project
+        
+        Runs a constant number of queries whatever the number of projects.
+        """
+        tasks_per_project = request.query_params.get('tasks_per_project')
+        if tasks_per_project is not None:
+            try:
+                tasks_per_project = int(tasks_per_project)
+                if tasks_per_project < 1:
+                    raise ValueError
+            except ValueError:
+                return Response(
+                    {'error': 'tasks_per_project must be a positive integer'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        projects = list(self.get_queryset())  # This will automatically create default project if needed
+        if wants_stream(request):
+            return streaming_json_response(self.stream_with_tasks(projects, tasks_per_project))
+        
+        tasks = apply_project_ordering(
+            Task.objects.filter(user=request.user).with_effective_suggested_todo_datetime(),
+            request.user,
+            projects,
+            tasks_per_project
+        )
+        # Prefetching also attaches each project to its tasks, so project_name/project_color are free
+        prefetch_related_objects(projects, Prefetch('tasks', queryset=tasks))
         serializer = ProjectTaskSerializer(projects, many=True)
         return Response(serializer.data)
+    
+    def stream_with_tasks(self, projects, tasks_per_project=None):
+        """
+        with_tasks output whose task lists are read from a single query in chunks,
+        grouped by project, as the response is written
+        """
+        tasks = apply_project_ordering(
+            Task.objects.filter(user=self.request.user).with_effective_suggested_todo_datetime(),
+            self.request.user,
+            projects,
+            tasks_per_project,
+            grouped=True
+        )
+        rows = TaskReadSerializer.rows(tasks).iterator(chunk_size=settings.STREAM_CHUNK_SIZE)
+        pending = [next(rows, None)]
+        
+        def project_tasks(project_id):
+            serializer = TaskReadSerializer()
+            while pending[0] is not None and pending[0]['project_id'] == project_id:
+                yield serializer.to_representation(pending[0])
+                pending[0] = next(rows, None)
+        
+        def project_items():
+            for project in projects:
+                serializer = ProjectTaskSerializer(project)
+                serializer.fields.pop('tasks')
+                data = serializer.data
+                yield {
+                    field: JSONStream(project_tasks(project.pk)) if field == 'tasks' else data[field]
+                    for field in ProjectTaskSerializer.Meta.fields
+                }
+        
+        return JSONStream(project_items())
 
 
 class TaskViewSet(viewsets.ModelViewSet):
@@ -197,12 +655,14 @@ class TaskViewSet(viewsets.ModelViewSet):
     queryset = Task.objects.all()
     
     def get_queryset(self):
-        """Return tasks for the authenticated user"""
-        tasks = Task.objects.filter(user=self.request.user)
-        # Update expired suggested_todo_datetime for all tasks
-        update_expired_suggested_todo_datetime(list(tasks))
-        return tasks
+        """
+        Return tasks for the authenticated user, annotated with the
+        rolled-over `effective_suggested_todo_datetime` (computed by the database)
+        """
+        return Task.objects.filter(user=self.request.user).with_effective_suggested_todo_datetime()
     
+    @method_decorator(condition(etag_func=collection_etag))
+    @method_decorator(cache_user_response)
     def list(self, request, *args, **kwargs):
         """
         List all tasks with custom ordering applied.
@@ -227,12 +687,22 @@ class TaskViewSet(viewsets.ModelViewSet):
         # This function checks if custom order exists and applies it, or returns default order
         tasks = apply_custom_ordering(tasks, request.user, 'all_tasks')
         
-        # Update expired suggested_todo_datetime for all tasks
-        tasks_list = list(tasks)
-        update_expired_suggested_todo_datetime(tasks_list)
-        
-        serializer = TaskSerializer(tasks_list, many=True)
-        return Response(serializer.data)
+        return self.task_list_response(tasks, CUSTOM_ORDER_KEYSET)
+    
+    def task_list_response(self, tasks, keyset):
+        """
+        Serialize a task collection. When the client asks for pages (`page_size` or
+        `cursor` query parameter) the result is paginated by `keyset`; otherwise
+        `stream=true` writes the list incrementally.
+        """
+        rows = TaskReadSerializer.rows(tasks)
+        paginator = KeysetPagination(keyset)
+        page = paginator.paginate_queryset(rows, self.request, view=self)
+        if page is None:
+            if wants_stream(self.request):
+                return streaming_json_response(stream_tasks(rows))
+            return Response(TaskReadSerializer(rows, many=True).data)
+        return paginator.get_paginated_response(TaskReadSerializer(page, many=True).data)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -247,6 +717,8 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
     
     @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=collection_etag))
+    @method_decorator(cache_user_response)
     def today(self, request):
         """
         Get tasks for today with custom ordering applied.
@@ -260,13 +732,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         - If NO: Returns tasks in default order (most recent first)
         """
         today = timezone.now().date()
-        start_of_day = timezone.make_aware(datetime.combine(today, datetime.min.time()))
-        end_of_day = timezone.make_aware(datetime.combine(today, datetime.max.time()))
-        
-        tasks = self.get_queryset().filter(
-            Q(suggested_todo_datetime__date=today) |
-            Q(deadline__date=today)
-        ).distinct()
+        tasks = self.get_queryset().on_day(request.user, today)
         
         # Filter by is_done if parameter is provided
         is_done_param = request.query_params.get('is_done')
@@ -278,14 +744,11 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Checks if custom order exists, uses it; otherwise returns default order
         tasks = apply_custom_ordering(tasks, request.user, 'today')
         
-        # Update expired suggested_todo_datetime for today's tasks
-        tasks_list = list(tasks)
-        update_expired_suggested_todo_datetime(tasks_list)
-        
-        serializer = TaskSerializer(tasks_list, many=True)
-        return Response(serializer.data)
+        return self.task_list_response(tasks, CUSTOM_ORDER_KEYSET)
     
     @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=collection_etag))
+    @method_decorator(cache_user_response)
     def by_date(self, request):
         """
         Get tasks for a specific date with custom ordering applied.
@@ -314,14 +777,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        start_of_day = timezone.make_aware(datetime.combine(target_date, datetime.min.time()))
-        end_of_day = timezone.make_aware(datetime.combine(target_date, datetime.max.time()))
-        
-        tasks = self.get_queryset().filter(
-            Q(suggested_todo_datetime__date=target_date) |
-            Q(deadline__date=target_date) |
-            Q(created_at__date=target_date)
-        ).distinct()
+        tasks = self.get_queryset().on_day(request.user, target_date, include_created=True)
         
         # Filter by is_done if parameter is provided
         is_done_param = request.query_params.get('is_done')
@@ -333,14 +789,57 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Checks if custom order exists for this specific date, uses it; otherwise returns default order
         tasks = apply_custom_ordering(tasks, request.user, 'by_date', date_str)
         
-        # Update expired suggested_todo_datetime for date-specific tasks
-        tasks_list = list(tasks)
-        update_expired_suggested_todo_datetime(tasks_list)
+        return self.task_list_response(tasks, CUSTOM_ORDER_KEYSET)
+    
+    @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=collection_etag))
+    @method_decorator(cache_user_response)
+    def calendar(self, request):
+        """
+        Get the tasks of every day in a date range, as `by_date` lists them.
         
-        serializer = TaskSerializer(tasks_list, many=True)
-        return Response(serializer.data)
+        Query parameters:
+        - start: Required. First day of the range (YYYY-MM-DD format)
+        - end: Required. Last day of the range (YYYY-MM-DD format), at most
+          CALENDAR_MAX_DAYS days after start
+        - is_done: Optional. Filter by completion status (true/false or 1/0)
+        
+        Returns a map of every date in the range to its tasks, each day in its
+        custom 'by_date' order when one exists (default order otherwise).
+        """
+        try:
+            start = datetime.strptime(request.query_params.get('start', ''), '%Y-%m-%d').date()
+            end = datetime.strptime(request.query_params.get('end', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'start and end parameters are required (YYYY-MM-DD format)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if end < start:
+            return Response(
+                {'error': 'end must not be before start'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end - start).days >= CALENDAR_MAX_DAYS:
+            return Response(
+                {'error': f'The range can cover at most {CALENDAR_MAX_DAYS} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        now = timezone.now()
+        tasks = self.get_queryset().on_days(request.user, start, end, now)
+        
+        # Filter by is_done if parameter is provided
+        is_done_param = request.query_params.get('is_done')
+        if is_done_param is not None:
+            is_done_value = is_done_param.lower() in ['true', '1']
+            tasks = tasks.filter(is_done=is_done_value)
+        
+        return Response(group_calendar_tasks(tasks, request.user, start, end, now))
     
     @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=collection_etag))
+    @method_decorator(cache_user_response)
     def by_project(self, request):
         """
         Get tasks for a specific project with custom ordering applied.
@@ -376,7 +875,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        tasks = project.tasks.all()
+        tasks = self.get_queryset().filter(project=project)
         
         # Filter by is_done if parameter is provided
         is_done_param = request.query_params.get('is_done')
@@ -388,44 +887,116 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Checks if custom order exists for this specific project, uses it; otherwise returns default order
         tasks = apply_custom_ordering(tasks, request.user, 'by_project', project_id)
         
-        # Update expired suggested_todo_datetime for project tasks
-        tasks_list = list(tasks)
-        update_expired_suggested_todo_datetime(tasks_list)
-        
-        serializer = TaskSerializer(tasks_list, many=True)
-        return Response(serializer.data)
+        return self.task_list_response(tasks, CUSTOM_ORDER_KEYSET)
     
     @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=collection_etag))
+    @method_decorator(cache_user_response)
     def pending(self, request):
         """Get all pending (not done) tasks"""
-        tasks = self.get_queryset().filter(is_done=False)
-        
-        # Update expired suggested_todo_datetime for pending tasks
-        tasks_list = list(tasks)
-        update_expired_suggested_todo_datetime(tasks_list)
+        tasks = self.get_queryset().filter(is_done=False).order_by('-created_at', 'id')
         
-        serializer = TaskSerializer(tasks_list, many=True)
-        return Response(serializer.data)
+        return self.task_list_response(tasks, CREATED_AT_KEYSET)
     
     @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=collection_etag))
+    @method_decorator(cache_user_response)
     def completed(self, request):
         """Get all completed tasks"""
-        tasks = self.get_queryset().filter(is_done=True)
+        tasks = self.get_queryset().filter(is_done=True).order_by('-created_at', 'id')
         
         # Note: We don't update suggested_todo_datetime for completed tasks
         # as they're already done
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data)
+        return self.task_list_response(tasks, CREATED_AT_KEYSET)
     
     @action(detail=True, methods=['post'])
     def toggle_done(self, request, pk=None):
         """Toggle the done status of a task"""
         task = self.get_object()
         task.is_done = not task.is_done
+        if task.is_done:
+            # Keep the rolled-over date the user saw when completing the task
+            task.suggested_todo_datetime = task.effective_suggested_todo_datetime
         task.save()
-        serializer = TaskSerializer(task)
+        serializer = TaskSerializer(self.get_queryset().get(pk=task.pk))
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=collection_etag))
+    @method_decorator(cache_user_response)
+    def search(self, request):
+        """
+        Full-text search over task titles and descriptions, best matches first.
+        
+        Query parameters:
+        - q: Required. Search terms (all of them must match)
+        - project_id: Optional. UUID of a project to search in
+        - is_done: Optional. Filter by completion status (true/false or 1/0)
+        - priority: Optional. low, medium, high or urgent
+        - page_size / cursor: Optional. Cursor pagination (see task lists)
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': 'q parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        tasks = self.get_queryset()
+        
+        project_id = request.query_params.get('project_id')
+        if project_id:
+            try:
+                tasks = tasks.filter(project_id=uuid.UUID(project_id))
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid UUID format for project_id'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        is_done_param = request.query_params.get('is_done')
+        if is_done_param is not None:
+            is_done_value = is_done_param.lower() in ['true', '1']
+            tasks = tasks.filter(is_done=is_done_value)
+        
+        priority = request.query_params.get('priority')
+        if priority:
+            if priority not in dict(PRIORITY_CHOICES):
+                return Response(
+                    {'error': f'priority must be one of: {", ".join(dict(PRIORITY_CHOICES))}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            tasks = tasks.filter(priority=priority)
+        
+        tasks = search_tasks(tasks, request.user, query).order_by('-search_rank', '-created_at', 'id')
+        return self.task_list_response(tasks, SEARCH_KEYSET)
+    
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Get task counts for dashboards and badges.
+        
+        Not cached and without ETag (like upcoming_deadlines): overdue, due_today
+        and due_this_week move as time passes, without any write.
+        
+        Query parameters:
+        - fields: Optional. Comma-separated sections to return, any of
+          totals, by_project, by_priority (default: all)
+        
+        Every section holds total, pending, completed, overdue, due_today and
+        due_this_week counts.
+        """
+        fields = request.query_params.get('fields')
+        sections = [field.strip() for field in fields.split(',') if field.strip()] if fields else list(STATS_SECTIONS)
+        invalid = [section for section in sections if section not in STATS_SECTIONS]
+        if invalid or not sections:
+            return Response(
+                {'error': f'fields must be a comma-separated list of: {", ".join(STATS_SECTIONS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(task_stats(request.user, list(dict.fromkeys(sections))))
+    
     @action(detail=False, methods=['get'])
     def upcoming_deadlines(self, request):
         """Get tasks with upcoming deadlines (next 7 days)"""
@@ -436,14 +1007,9 @@ class TaskViewSet(viewsets.ModelViewSet):
             deadline__gte=now,
             deadline__lte=week_from_now,
             is_done=False
-        ).order_by('deadline')
+        ).order_by('deadline', 'id')
         
-        # Update expired suggested_todo_datetime for upcoming deadline tasks
-        tasks_list = list(tasks)
-        update_expired_suggested_todo_datetime(tasks_list)
-        
-        serializer = TaskSerializer(tasks_list, many=True)
-        return Response(serializer.data)
+        return self.task_list_response(tasks, DEADLINE_KEYSET)
     
     @action(detail=False, methods=['post'])
     def reorder(self, request):
@@ -466,40 +1032,9 @@ class TaskViewSet(viewsets.ModelViewSet):
         task_ids = serializer.validated_data['task_ids']
         
         # Validate reference based on context
-        if context == 'by_project':
-            if not reference:
-                return Response(
-                    {'error': 'reference (project_id) is required for by_project context'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            try:
-                # Verify project exists and belongs to user
-                project_uuid = uuid.UUID(reference)
-                Project.objects.get(id=project_uuid, user=request.user)
-            except (ValueError, TypeError):
-                return Response(
-                    {'error': 'Invalid UUID format for project_id'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            except Project.DoesNotExist:
-                return Response(
-                    {'error': 'Project not found'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-        
-        elif context == 'by_date':
-            if not reference:
-                return Response(
-                    {'error': 'reference (date) is required for by_date context'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            try:
-                datetime.strptime(reference, '%Y-%m-%d')
-            except ValueError:
-                return Response(
-                    {'error': 'Invalid date format. Use YYYY-MM-DD'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        error = validate_order_reference(request.user, context, reference)
+        if error:
+            return error
         
         # Create or update task order
         count = create_or_update_task_order(
@@ -516,6 +1051,118 @@ class TaskViewSet(viewsets.ModelViewSet):
             'tasks_ordered': count
         }, status=status.HTTP_200_OK)
     
+    @action(detail=True, methods=['post'])
+    def move(self, request, pk=None):
+        """
+        Move a single task within a context's custom order.
+        
+        Request body:
+        {
+            "context": "all_tasks|by_project|today|by_date",
+            "reference": "optional reference (project_id for by_project, date for by_date)",
+            "after_id": "task that should come right before this task (optional)",
+            "before_id": "task that should come right after this task (optional)"
+        }
+        
+        At least one neighbour is required. Only the moved task's order row is written.
+        """
+        task = self.get_object()
+        serializer = MoveTaskSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        context = serializer.validated_data['context']
+        reference = serializer.validated_data.get('reference') or ''
+        before_id = serializer.validated_data.get('before_id')
+        after_id = serializer.validated_data.get('after_id')
+        
+        error = validate_order_reference(request.user, context, reference)
+        if error:
+            return error
+        
+        if context == 'by_project' and str(task.project_id) != reference:
+            return Response(
+                {'error': 'Task does not belong to this project'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            position = move_task_order(
+                request.user, context, reference, task,
+                before_id=before_id, after_id=after_id
+            )
+        except Task.DoesNotExist:
+            return Response(
+                {'error': 'Neighbour task not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': 'Task moved successfully',
+            'context': context,
+            'reference': reference,
+            'task_id': str(task.id),
+            'position': position
+        }, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Create, update and delete many tasks in one request.
+        
+        Request body:
+        {
+            "operations": [
+                {"op": "create", "id": "optional client-generated UUID", "data": {"title": "...", "project": "project_id", ...}},
+                {"op": "update", "id": "task_id", "data": {"is_done": true, ...}},
+                {"op": "delete", "id": "task_id"}
+            ]
+        }
+        
+        Operations are validated together and applied in one transaction: if any
+        operation is invalid, nothing is applied and the errors are returned by index.
+        """
+        serializer = BatchTasksSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        with transaction.atomic():
+            # Taken before parsing locks the tasks, like every write does
+            change_seq = ChangeSequence.next_value(request.user.pk)
+            parsed, projects, tasks, errors = parse_batch_operations(
+                request.user, serializer.validated_data['operations']
+            )
+            if errors:
+                return Response({
+                    'error': 'Invalid operations, nothing was applied',
+                    'errors': [{'index': index, 'errors': errors[index]} for index in sorted(errors)]
+                }, status=status.HTTP_400_BAD_REQUEST)
+            created_ids, updated_ids, deleted_ids = apply_batch_operations(
+                request.user, parsed, projects, tasks, change_seq
+            )
+        
+        rows = TaskReadSerializer.rows(self.get_queryset().filter(id__in=created_ids + updated_ids))
+        task_data = {row['id']: row for row in TaskReadSerializer(rows, many=True).data}
+        created = iter(created_ids)
+        results = []
+        for op in parsed:
+            result = {'op': op['op'], 'status': f"{op['op']}d"}
+            task_id = next(created) if op['op'] == 'create' else op['id']
+            result['id'] = str(task_id)
+            if op['op'] != 'delete':
+                result['task'] = task_data[str(task_id)]
+            results.append(result)
+        
+        return Response({
+            'message': 'Batch applied successfully',
+            'created': len(created_ids),
+            'updated': len(updated_ids),
+            'deleted': len(deleted_ids),
+            'results': results
+        }, status=status.HTTP_200_OK)
+    
     @action(detail=False, methods=['get'])
     def get_order(self, request):
         """
@@ -553,3 +1200,76 @@ class TaskViewSet(viewsets.ModelViewSet):
             'reference': reference,
             'orders': serializer.data
         })
+
+
+@api_view(['GET'])
+@renderer_classes([NDJSONRenderer, CSVRenderer])
+def export_data(request):
+    """
+    Stream all of the user's projects, tasks and task orders.
+    
+    Query parameters:
+    - format: Optional. 'ndjson' (default, one {"type", "data"} object per line) or 'csv'
+    - gzip: Optional. 'true' to compress the file on the fly
+    """
+    export_format = request.accepted_renderer.format
+    compress = request.query_params.get('gzip', '').lower() in ['true', '1']
+    
+    filename = f'joggle-export-{timezone.now().date()}.{export_format}'
+    content_type = request.accepted_renderer.media_type
+    if compress:
+        filename += '.gz'
+        content_type = 'application/gzip'
+    
+    response = StreamingHttpResponse(
+        export_stream(request.user, export_format, compress),
+        content_type=content_type
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@api_view(['GET'])
+def sync(request):
+    """
+    Return what changed in the user's projects, tasks and task orders since the
+    previous sync.
+    
+    Query parameters:
+    - since: Optional. Token returned by the previous sync; without it every row is returned
+    """
+    try:
+        changes = collect_changes(request.user, request.query_params.get('since'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(changes)
+
+
+@api_view(['GET'])
+def autocomplete(request):
+    """
+    Typo-tolerant matches for pickers, best first.
+    
+    Query parameters:
+    - q: Required. Text typed so far
+    - kind: Optional. 'task' (default, matches titles) or 'project' (matches names)
+    - limit: Optional. Number of matches, 1-50 (default 10)
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'q parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    kind = request.query_params.get('kind', 'task')
+    if kind not in AUTOCOMPLETE_KINDS:
+        return Response(
+            {'error': f'kind must be one of: {", ".join(AUTOCOMPLETE_KINDS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        limit = int(request.query_params.get('limit', 10))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, 50))
+    
+    return Response({'results': autocomplete_matches(request.user.pk, kind, query, limit)})
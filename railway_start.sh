@@ -24,4 +24,4 @@ else:
 
 # Start the application
 echo "🌟 Starting Gunicorn server..."
-exec gunicorn joggle.wsgi --bind 0.0.0.0:$PORT --log-file -
+exec gunicorn joggle.wsgi --bind 0.0.0.0:$PORT --worker-class gthread --threads 4 --log-file -